@@ -12,6 +12,7 @@ class DashIFrameWidget extends widgets_1.Widget {
      */
     constructor(port, url) {
         super();
+        this.canSoftRefresh = false;
         this.id = port;
         this.title.label = `Dash (port: ${port})`;
         this.title.closable = true;
@@ -26,13 +27,48 @@ class DashIFrameWidget extends widgets_1.Widget {
         this.iframe = iframeElement;
         this.iframe.src = serviceUrl;
         this.iframe.id = 'iframe-' + this.id;
+        this.url = serviceUrl;
         this.node.appendChild(this.iframe);
     }
+    /**
+     * Set the app shown by the widget, refreshed on the next update.
+     */
+    setSource(url, assetsHash) {
+        // The page loaded in the iframe can only be soft refreshed if it was served
+        // with the same assets
+        this.canSoftRefresh =
+            url === this.url && !!assetsHash && assetsHash === this.assetsHash;
+        this.url = url;
+        this.assetsHash = assetsHash;
+    }
+    /**
+     * Re-mount the Dash renderer of the loaded page, which re-fetches only the
+     * layout and dependencies. Returns false if the page doesn't support it, or
+     * isn't accessible because it's served from another origin.
+     */
+    softRefresh() {
+        if (!this.canSoftRefresh) {
+            return false;
+        }
+        try {
+            const contentWindow = this.iframe.contentWindow;
+            if (contentWindow && typeof contentWindow.jupyterDashSoftRefresh === 'function') {
+                contentWindow.jupyterDashSoftRefresh();
+                return true;
+            }
+        }
+        catch (e) {
+            // Cross-origin iframe
+        }
+        return false;
+    }
     /**
      * Handle update requests for the widget.
      */
     onUpdateRequest(msg) {
-        this.iframe.src += '';
+        if (!this.softRefresh()) {
+            this.iframe.src = this.url;
+        }
     }
 }
 function activate(app, restorer, notebooks, consoles) {
@@ -67,13 +103,13 @@ function registerCommTarget(kernel, widgets, app) {
                 if (!widgets.has(msgData.port)) {
                     // Create a new widget
                     widget = new DashIFrameWidget(msgData.port, msgData.url);
-                    widget.update();
                     widgets.set(msgData.port, widget);
                     // Add instance tracker stuff
                 }
                 else {
                     widget = widgets.get(msgData.port);
                 }
+                widget.setSource(msgData.url, msgData.assets_hash);
                 if (!widget.isAttached) {
                     // Attach the widget to the main work area
                     // if it's not there
@@ -41,6 +41,7 @@ class DashIFrameWidget extends Widget {
     this.iframe = iframeElement;
     this.iframe.src = serviceUrl;
     this.iframe.id = 'iframe-' + this.id;
+    this.url = serviceUrl;
 
     this.node.appendChild(this.iframe);
   }
@@ -50,18 +51,59 @@ class DashIFrameWidget extends Widget {
    */
   readonly iframe: HTMLIFrameElement;
 
+  /**
+   * Set the app shown by the widget, refreshed on the next update.
+   */
+  setSource(url: string, assetsHash?: string): void {
+    // The page loaded in the iframe can only be soft refreshed if it was served
+    // with the same assets
+    this.canSoftRefresh =
+      url === this.url && !!assetsHash && assetsHash === this.assetsHash;
+    this.url = url;
+    this.assetsHash = assetsHash;
+  }
+
+  /**
+   * Re-mount the Dash renderer of the loaded page, which re-fetches only the
+   * layout and dependencies. Returns false if the page doesn't support it, or
+   * isn't accessible because it's served from another origin.
+   */
+  softRefresh(): boolean {
+    if (!this.canSoftRefresh) {
+      return false;
+    }
+    try {
+      const contentWindow = this.iframe.contentWindow as any;
+      if (contentWindow && typeof contentWindow.jupyterDashSoftRefresh === 'function') {
+        contentWindow.jupyterDashSoftRefresh();
+        return true;
+      }
+    } catch (e) {
+      // Cross-origin iframe
+    }
+    return false;
+  }
+
   /**
    * Handle update requests for the widget.
    */
   onUpdateRequest(msg: Message): void {
-    this.iframe.src += '';
+    if (!this.softRefresh()) {
+      this.iframe.src = this.url;
+    }
   }
+
+  private url: string;
+  private assetsHash: string | undefined;
+  private canSoftRefresh = false;
 }
 
 interface DashMessageData {
   type: string;
   port: string;
   url: string;
+  version?: number;
+  assets_hash?: string;
 }
 
 function activate(
@@ -111,13 +153,13 @@ function registerCommTarget(
           if (!widgets.has(msgData.port)) {
             // Create a new widget
             widget = new DashIFrameWidget(msgData.port, msgData.url);
-            widget.update();
             widgets.set(msgData.port, widget);
 
             // Add instance tracker stuff
           } else {
             widget = widgets.get(msgData.port);
           }
+          widget.setSource(msgData.url, msgData.assets_hash);
 
           if (!widget.isAttached) {
             // Attach the widget to the main work area
@@ -1,5 +1,10 @@
 import jupyter_dash.comms
 from .jupyter_app import JupyterDash
+from .session_store import ServerSideStore
+from .scheduling import KernelAwareScheduler
+from .ratelimit import ClientRateLimiter
+from .timeouts import check_cancelled, CallbackCancelled, CallbackTimeout
+from .testing import CallbackTestClient, CallbackError
 from .version import __version__
 
 def _jupyter_nbextension_paths():
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import os
+import pkgutil
+import posixpath
+import socket
+import sys
+import threading
+
+import flask
+from werkzeug.serving import make_server
+
+_ASSETS_ROUTE = "_jupyter-dash-assets/"
+_SUITES_ROUTE = "_dash-component-suites/"
+
+_MIMETYPES = {
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".map": "application/json",
+}
+
+
+def _resource_url(src, url_attr="src"):
+    return src.get(url_attr) if isinstance(src, dict) else src
+
+
+def _port_free(host, port):
+    """Whether port can be bound on host. Checked up front since werkzeug exits
+    the process when it can't bind its server."""
+    try:
+        family = socket.getaddrinfo(host, port)[0][0]
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, port))
+    except OSError:
+        return False
+    return True
+
+
+class SharedAssetServer(object):
+    """Kernel-wide server for the component bundles of every JupyterDash app.
+
+    Each app serves its own copy of the Dash renderer and component bundles under
+    its own host and port, so the browser downloads them again for every app,
+    and again whenever an app moves to another port. Apps run with
+    ``run(shared_assets=True)`` instead reference the bundles by a hash of their
+    content, at URLs served by this single server with immutable cache headers,
+    so they are downloaded once per kernel and browser.
+
+    Files loaded by a bundle relative to its own URL (e.g. async chunks) are served
+    from the bundle's package directory.
+
+    One server is run for each host that apps are run on, on ``default_port`` if
+    it is free, so that the URLs, and the browser's cache, remain valid across
+    kernel restarts. If the port is taken, e.g. by the asset server of another
+    kernel, a free port is used instead, and bundles are downloaded again
+    whenever that port changes.
+    """
+    default_port = int(os.environ.get("JUPYTER_DASH_ASSETS_PORT", 8049))
+
+    def __init__(self):
+        # digest -> (namespace, directory of the bundle within the package)
+        self._bundles = {}
+        # (namespace, path, modification time) -> digest
+        self._digests = {}
+        self._lock = threading.Lock()
+        # host -> server bound to it
+        self._servers = {}
+
+        self.flask_app = flask.Flask(__name__)
+        self.flask_app.add_url_rule(
+            "/" + _ASSETS_ROUTE + "<digest>/<path:filename>", "asset", self._serve
+        )
+
+    def start(self, host, port=None):
+        """Start serving on host, unless already running there. Returns the port.
+
+        :param port: Port to serve on, if not already running. Defaults to
+            ``default_port``, or a free port if that is taken.
+        """
+        with self._lock:
+            server = self._servers.get(host)
+            if server is None:
+                if port is None:
+                    port = self.default_port if _port_free(host, self.default_port) \
+                        else 0
+                server = make_server(host, port, self.flask_app, threaded=True)
+                logging.getLogger("werkzeug").setLevel(logging.ERROR)
+                thread = threading.Thread(target=server.serve_forever)
+                thread.daemon = True
+                thread.start()
+                self._servers[host] = server
+            return server.server_port
+
+    def shutdown(self):
+        with self._lock:
+            servers = list(self._servers.values())
+            self._servers.clear()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def _register(self, namespace, path):
+        """Return the content hash of the file at path in the namespace package"""
+        modified = os.stat(os.path.join(
+            os.path.dirname(sys.modules[namespace].__file__), path
+        )).st_mtime
+        key = (namespace, path, modified)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            data = pkgutil.get_data(namespace, path)
+            digest = hashlib.sha256(data).hexdigest()[:20]
+            with self._lock:
+                self._digests[key] = digest
+                self._bundles[digest] = (namespace, posixpath.dirname(path))
+        return digest
+
+    def _rewrite(self, srcs, suites_prefix, base_url):
+        """Replace the component suite URLs of srcs, as generated by
+        Dash._collect_and_register_resources, with shared asset URLs"""
+        from dash.fingerprint import check_fingerprint
+
+        rewritten = []
+        for src in srcs:
+            for attr in ("src", "href"):
+                url = _resource_url(src, attr)
+                if isinstance(url, str) and url.startswith(suites_prefix):
+                    break
+            else:
+                rewritten.append(src)
+                continue
+
+            namespace, _, fingerprinted = url[len(suites_prefix):].partition("/")
+            path, _ = check_fingerprint(fingerprinted.split("?")[0])
+            try:
+                digest = self._register(namespace, path)
+            except (OSError, ImportError, KeyError, ValueError):
+                rewritten.append(src)
+                continue
+
+            shared_url = "{base_url}{route}{digest}/{name}".format(
+                base_url=base_url, route=_ASSETS_ROUTE, digest=digest,
+                name=posixpath.basename(path),
+            )
+            rewritten.append(
+                dict(src, **{attr: shared_url}) if isinstance(src, dict)
+                else shared_url
+            )
+        return rewritten
+
+    def _serve(self, digest, filename):
+        with self._lock:
+            bundle = self._bundles.get(digest)
+        extension = posixpath.splitext(filename)[1]
+        if bundle is None or extension not in _MIMETYPES:
+            flask.abort(404)
+
+        from dash.fingerprint import check_fingerprint
+
+        namespace, directory = bundle
+        filename, _ = check_fingerprint(filename)
+        path = posixpath.normpath(posixpath.join(directory, filename))
+        if path == ".." or path.startswith("../") or path.startswith("/"):
+            flask.abort(404)
+        try:
+            data = pkgutil.get_data(namespace, path)
+        except (OSError, ImportError, ValueError):
+            data = None
+        if data is None:
+            flask.abort(404)
+
+        response = flask.Response(data, mimetype=_MIMETYPES[extension])
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        # Bundles are loaded from the origin of each app
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        return response
+
+
+_shared_asset_server = SharedAssetServer()
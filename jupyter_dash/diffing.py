@@ -0,0 +1,180 @@
+import collections
+import itertools
+import json
+import threading
+
+import flask
+
+from .session_store import _session_id
+
+_PATCH_KEY = "__dash_patch_update"
+
+
+def _assign(location, value):
+    return {"operation": "Assign", "location": location, "params": {"value": value}}
+
+
+def _same(old, new):
+    """Whether old and new serialize to the same JSON. Unlike ==, values of
+    different types are never the same, e.g. 1 and True or 1 and 1.0."""
+    if type(old) is not type(new):
+        return False
+    if isinstance(new, dict):
+        return old.keys() == new.keys() and all(_same(old[k], new[k]) for k in new)
+    if isinstance(new, list):
+        return len(old) == len(new) and all(map(_same, old, new))
+    return old == new
+
+
+def _diff(old, new, location, operations):
+    """Append the Patch operations transforming old into new at location to
+    operations. Returns False if the values can't be patched at this location
+    (i.e. the value must be replaced as a whole)."""
+    if type(old) is not type(new):
+        if not location:
+            return False
+        operations.append(_assign(location, new))
+    elif isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                operations.append(
+                    {"operation": "Delete", "location": location + [key], "params": {}}
+                )
+        for key, value in new.items():
+            if key not in old:
+                operations.append(_assign(location + [key], value))
+            elif old[key] != value or not _same(old[key], value):
+                _diff(old[key], value, location + [key], operations)
+    elif isinstance(new, list):
+        if len(old) == len(new):
+            for i, (old_item, new_item) in enumerate(zip(old, new)):
+                if old_item != new_item or not _same(old_item, new_item):
+                    _diff(old_item, new_item, location + [i], operations)
+        elif len(old) < len(new) and _same(new[:len(old)], old):
+            operations.append({
+                "operation": "Extend", "location": location,
+                "params": {"value": new[len(old):]},
+            })
+        elif not location:
+            return False
+        else:
+            operations.append(_assign(location, new))
+    else:
+        if not location:
+            return False
+        operations.append(_assign(location, new))
+    return True
+
+
+class OutputDiffer(object):
+    """Replace callback outputs with ``dash.Patch`` updates relative to the value
+    last sent to the same browser session, when the patch is smaller.
+
+    Only dict and list valued props (e.g. figures) are diffed. The value last
+    sent for each (session, component, prop) is remembered, and forgotten when the
+    session reloads the page. This assumes each browser session displays the app
+    in a single tab, and that the diffed props are only updated by server-side
+    callbacks.
+
+    The renderer drops the response to a callback request once a newer request
+    for the same outputs has been made, so only responses to the most recent
+    request for a session's outputs are diffed and remembered.
+    """
+    def __init__(self, max_sessions=100):
+        self.max_sessions = max_sessions
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # (session, outputs) -> sequence number of the most recent request
+        self._latest = {}
+        self._sequence = itertools.count()
+        self.bytes_saved = 0
+
+    def reset_session(self):
+        """Forget the values sent to the current session"""
+        with self._lock:
+            self._sessions.pop(_session_id(), None)
+
+    def _last_values(self, sid):
+        with self._lock:
+            values = self._sessions.get(sid)
+            if values is None:
+                values = self._sessions[sid] = {}
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(sid)
+            return values
+
+    def _begin(self):
+        """Record the start of the current callback request. Returns the token
+        to pass to process and _end."""
+        body = flask.request.get_json(silent=True) or {}
+        key = (_session_id(), str(body.get("output")))
+        with self._lock:
+            token = self._latest[key] = (key, next(self._sequence))
+        return token
+
+    def _end(self, token):
+        key = token[0]
+        with self._lock:
+            if self._latest.get(key) == token:
+                del self._latest[key]
+
+    def process(self, response, token):
+        """Rewrite the body of a ``_dash-update-component`` response in place"""
+        if response.status_code != 200 or response.direct_passthrough or \
+                response.headers.get("Content-Encoding"):
+            return response
+
+        with self._lock:
+            superseded = self._latest.get(token[0]) != token
+        if superseded:
+            # The browser won't apply this response, so it neither changes the
+            # values it holds nor can be patched against them
+            return response
+
+        try:
+            data = json.loads(response.get_data())
+            outputs = data["response"]
+        except (ValueError, KeyError, TypeError):
+            return response
+
+        last_values = self._last_values(_session_id())
+        changed = False
+        for component_id, props in outputs.items():
+            for prop, value in props.items():
+                key = (component_id, prop)
+                previous = last_values.pop(key, None)
+                if isinstance(value, dict) and _PATCH_KEY in value:
+                    # The callback returned its own Patch, the resulting value
+                    # is only known to the browser
+                    continue
+                if not isinstance(value, (dict, list)):
+                    continue
+
+                last_values[key] = value
+                if previous is None:
+                    continue
+
+                operations = []
+                if not _diff(previous, value, [], operations):
+                    continue
+                patch = {_PATCH_KEY: _PATCH_KEY, "operations": operations}
+                patch_size = len(json.dumps(patch, separators=(",", ":")))
+                full_size = len(json.dumps(value, separators=(",", ":")))
+                if patch_size < full_size:
+                    props[prop] = patch
+                    self.bytes_saved += full_size - patch_size
+                    changed = True
+
+        if changed:
+            response.set_data(json.dumps(data, separators=(",", ":")))
+        return response
+
+    def _reset_on_page_load(self, layout_endpoint):
+        """before_request hook forgetting a session's values when it fetches the
+        layout, i.e. when the page is (re)loaded"""
+        def reset():
+            if flask.request.endpoint == layout_endpoint:
+                self.reset_session()
+        return reset
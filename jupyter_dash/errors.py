@@ -0,0 +1,64 @@
+import reprlib
+import time
+
+# Cap on the rendered text kept per error, reprs of large locals are the main
+# contributor to the size of a rendered traceback
+_MAX_RENDERED_CHARS = 200000
+
+
+def _make_repr(max_chars):
+    summary = reprlib.Repr()
+    summary.maxstring = max_chars
+    summary.maxother = max_chars
+    summary.maxlist = summary.maxtuple = summary.maxset = summary.maxdict = 10
+    return summary
+
+
+def _summarize_locals(tb, max_chars=200):
+    """Return size-limited reprs of the locals of the innermost frame of tb"""
+    if tb is None:
+        return {}
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+
+    summary = _make_repr(max_chars)
+    summarized = {}
+    for name, value in tb.tb_frame.f_locals.items():
+        try:
+            text = summary.repr(value)
+        except Exception:
+            text = "<unrepresentable {typ}>".format(typ=type(value).__name__)
+        if len(text) > max_chars:
+            text = text[:max_chars - 3] + "..."
+        summarized[name] = text
+    return summarized
+
+
+class ErrorRecord(object):
+    """A callback error rendered for display, without references to the stack
+    frames (and their locals) that raised it
+
+    :ivar timestamp: Time the error occurred, in seconds since the epoch
+    :ivar callback: Output of the failing callback, as a key of app.callback_map
+    :ivar exc_type: Name of the exception class
+    :ivar message: str of the exception
+    :ivar text: ANSI colored traceback as printed in the notebook
+    :ivar html: HTML traceback as sent to the Dash dev tools
+    :ivar locals: dict of size-limited reprs of the locals of the frame that
+        raised the exception
+    """
+    def __init__(self, callback, exc_type, exc_value, tb, text, html):
+        self.timestamp = time.time()
+        self.callback = callback
+        self.exc_type = exc_type.__name__ if exc_type is not None else None
+        self.message = str(exc_value)
+        self.text = text[:_MAX_RENDERED_CHARS]
+        self.html = html[:_MAX_RENDERED_CHARS]
+        self.locals = _summarize_locals(tb)
+
+    def __repr__(self):
+        return "<ErrorRecord {time} {callback}: {exc_type}: {message}>".format(
+            time=time.strftime("%H:%M:%S", time.localtime(self.timestamp)),
+            callback=self.callback, exc_type=self.exc_type,
+            message=reprlib.repr(self.message),
+        )
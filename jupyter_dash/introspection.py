@@ -0,0 +1,211 @@
+def _iter_components(layout):
+    """Yield every component in a layout tree, depth first"""
+    if callable(layout) and not hasattr(layout, "_prop_names"):
+        layout = layout()
+
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(reversed(node))
+            continue
+        if not hasattr(node, "_prop_names"):
+            continue
+
+        yield node
+
+        # Components may be nested in children or in any other prop
+        for prop in reversed(node._prop_names):
+            value = getattr(node, prop, None)
+            if hasattr(value, "_prop_names") or isinstance(value, (list, tuple)):
+                stack.append(value)
+
+
+def _layout_components(layout):
+    """Map component ids to components for every component with a string id"""
+    return {
+        component.id: component
+        for component in _iter_components(layout)
+        if isinstance(getattr(component, "id", None), str)
+    }
+
+
+def _option_values(options):
+    """Extract the selectable values from a Dropdown/RadioItems/Checklist options
+    prop, which may be a list of values, a list of dicts or a value -> label dict"""
+    if isinstance(options, dict):
+        return list(options)
+    values = []
+    for option in options or []:
+        if isinstance(option, dict):
+            if not option.get("disabled", False) and "value" in option:
+                values.append(option["value"])
+        else:
+            values.append(option)
+    return values
+
+
+def _prop_domain(component, prop):
+    """Return the finite list of values a prop can take, or None if the domain is
+    not enumerable from the layout"""
+    options = getattr(component, "options", None)
+    if options is None or prop != "value":
+        return None
+
+    values = _option_values(options)
+    if getattr(component, "multi", False) or type(component).__name__ == "Checklist":
+        # Multi-value components take subsets; limit these to the empty selection
+        # and each single selection, which keeps the domain linear in the options
+        return [[]] + [[v] for v in values]
+    return values
+
+
+def _split_output_key(key):
+    """Split a callback_map key into a list of (id, property) pairs"""
+    if key.startswith(".."):
+        parts = key[2:-2].split("...")
+    else:
+        parts = [key]
+    return [tuple(part.rsplit(".", 1)) for part in parts]
+
+
+def _callback_specs(app):
+    """Return a list of dicts describing the server-side callbacks of app.
+
+    Each dict has the keys ``output`` (the callback_map key), ``outputs``,
+    ``inputs`` and ``state`` (lists of ``{"id", "property"}`` dicts), ``multi`` and
+    ``callback`` (the registered function). Callbacks using pattern-matching ids
+    or without outputs are omitted since their payloads depend on the rendered
+    page.
+    """
+    callback_map = dict(app.callback_map)
+    try:
+        # Callbacks registered with dash.callback are only merged into the app
+        # on the first request
+        from dash import _callback
+        for key, value in getattr(_callback, "GLOBAL_CALLBACK_MAP", {}).items():
+            callback_map.setdefault(key, value)
+    except ImportError:
+        pass
+
+    specs = []
+    for key, cb in callback_map.items():
+        if cb.get("no_output"):
+            continue
+
+        deps = list(cb.get("inputs", [])) + list(cb.get("state", []))
+        if any(not isinstance(dep["id"], str) for dep in deps):
+            continue
+        outputs = _split_output_key(key)
+        if any(component_id.startswith("{") for component_id, _ in outputs):
+            continue
+
+        specs.append({
+            "output": key,
+            "outputs": [{"id": i, "property": p} for i, p in outputs],
+            "multi": key.startswith(".."),
+            "inputs": [dict(id=d["id"], property=d["property"]) for d in cb["inputs"]],
+            "state": [dict(id=d["id"], property=d["property"]) for d in cb["state"]],
+            "callback": cb.get("callback"),
+        })
+    return specs
+
+
+def _dep_key(dep):
+    return "{id}.{property}".format(**dep)
+
+
+def _callback_payload(spec, values, changed=None):
+    """Build the JSON body of a ``_dash-update-component`` request
+
+    :param spec: A callback spec, as returned by ``_callback_specs``
+    :param values: dict from "id.prop" strings to the values of the callback's
+        inputs and state. Missing entries are sent as None.
+    :param changed: List of "id.prop" strings that triggered the callback.
+        Defaults to all inputs.
+    """
+    def with_values(deps):
+        return [dict(dep, value=values.get(_dep_key(dep))) for dep in deps]
+
+    if changed is None:
+        changed = [_dep_key(dep) for dep in spec["inputs"]]
+
+    return {
+        "output": spec["output"],
+        "outputs": spec["outputs"] if spec["multi"] else spec["outputs"][0],
+        "inputs": with_values(spec["inputs"]),
+        "state": with_values(spec["state"]),
+        "changedPropIds": list(changed),
+    }
+
+
+def _initial_values(app, specs):
+    """Map "id.prop" strings to their values in the app's initial layout"""
+    components = _layout_components(app.layout)
+    values = {}
+    for spec in specs:
+        for dep in spec["inputs"] + spec["state"]:
+            component = components.get(dep["id"])
+            if component is not None:
+                values[_dep_key(dep)] = getattr(component, dep["property"], None)
+    return values
+
+
+def _input_domains(app, specs):
+    """Map "id.prop" strings of callback inputs to their enumerable domains"""
+    components = _layout_components(app.layout)
+    domains = {}
+    for spec in specs:
+        for dep in spec["inputs"]:
+            component = components.get(dep["id"])
+            if component is None:
+                continue
+            domain = _prop_domain(component, dep["property"])
+            if domain:
+                domains[_dep_key(dep)] = domain
+    return domains
+
+
+def _output_key(output):
+    """Convert an Output, a list of Outputs or a callback_map key to the key"""
+    if isinstance(output, str):
+        return output
+    if isinstance(output, (list, tuple)):
+        return "..{keys}..".format(keys="...".join(str(o) for o in output))
+    return str(output)
+
+
+def _find_spec(specs, output):
+    """Find the spec of the callback that updates output, which may be given as
+    anything accepted by _output_key or as the decorated callback function"""
+    if callable(output) and not hasattr(output, "component_id"):
+        for spec in specs:
+            fn = spec["callback"]
+            while fn is not None:
+                if fn is output:
+                    return spec
+                fn = getattr(fn, "__wrapped__", None)
+        raise KeyError("{fn} is not a callback of this app".format(fn=output))
+
+    key = _output_key(output)
+    for spec in specs:
+        if spec["output"] == key:
+            return spec
+    # Allow a single output of a multi-output callback to identify it
+    for spec in specs:
+        if key in (_dep_key(o) for o in spec["outputs"]):
+            return spec
+    raise KeyError("No callback with output {key}".format(key=key))
+
+
+def _decode_response(spec, response):
+    """Convert the ``response`` of a ``_dash-update-component`` reply into the
+    value(s) returned by the callback. Outputs absent from the response are
+    returned as ``dash.no_update``."""
+    from dash import no_update
+
+    outputs = []
+    for output in spec["outputs"]:
+        props = response.get(output["id"], {})
+        outputs.append(props.get(output["property"], no_update))
+    return tuple(outputs) if spec["multi"] else outputs[0]
@@ -0,0 +1,546 @@
+import inspect
+import io
+import json
+import os
+import pickle
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import threading
+import time
+import types
+import weakref
+from multiprocessing.connection import (
+    Connection, Listener, answer_challenge, deliver_challenge
+)
+
+# Buffers larger than this are passed through shared memory rather than pickled
+_SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+# Dash constructor arguments forwarded from the kernel's app to the subprocess
+_FORWARDED_CONFIG = [
+    "assets_folder", "assets_url_path", "assets_ignore", "assets_external_path",
+    "include_assets_files", "serve_locally", "compress", "meta_tags",
+    "index_string", "external_scripts", "external_stylesheets",
+    "suppress_callback_exceptions", "prevent_initial_callbacks",
+    "show_undo_redo", "update_title", "title", "eager_loading",
+    "extra_hot_reload_paths", "requests_pathname_prefix", "routes_pathname_prefix",
+]
+
+
+def _state_dir():
+    from jupyter_core.paths import jupyter_runtime_dir
+
+    path = os.path.join(jupyter_runtime_dir(), "jupyter_dash")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not _private(path):
+        raise OSError(
+            "Refusing to use {path} for isolated server state, it must be a "
+            "directory owned by the current user and inaccessible to others"
+            .format(path=path)
+        )
+    return path
+
+
+def _private(path):
+    """Whether path, which isn't followed if it is a symlink, is owned by the
+    current user and has no group or other permissions. State files name the
+    control channel of a server process, whose replies are unpickled, so they
+    must not be writable by anyone else."""
+    if not hasattr(os, "getuid"):
+        # Windows, where the runtime directory is in the user's profile
+        return True
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        not stat.S_ISLNK(st.st_mode) and st.st_uid == os.getuid() and
+        not st.st_mode & 0o077
+    )
+
+
+def _connect(address, authkey, timeout):
+    """multiprocessing.connection.Client with timeouts on connecting and on each
+    receive, so that a hung server process can't block the kernel"""
+    sock = socket.create_connection(address, timeout=timeout)
+    sock.settimeout(None)
+    # Applies to the blocking reads of the Connection
+    if sys.platform == "win32":
+        timeval = struct.pack("L", int(timeout * 1000))
+    else:
+        timeval = struct.pack("ll", int(timeout), int(timeout % 1 * 1000000))
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, timeval)
+    conn = Connection(sock.detach())
+    try:
+        answer_challenge(conn, authkey)
+        deliver_challenge(conn, authkey)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _state_path(host, port):
+    return os.path.join(
+        _state_dir(), "isolated-{host}-{port}.json".format(host=host, port=port)
+    )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _dumps(app, definitions):
+    """Pickle definitions with cloudpickle, moving large buffers to shared memory.
+
+    References to app and its Flask server are replaced by placeholders that the
+    subprocess resolves to its own app.
+    """
+    try:
+        import cloudpickle
+    except ImportError:
+        raise ImportError(
+            "Running a JupyterDash app with isolate=True requires the cloudpickle "
+            "package to send callbacks to the server process.\n"
+            "    $ pip install cloudpickle"
+        )
+    from multiprocessing import shared_memory
+
+    segments = []
+
+    def buffer_callback(buffer):
+        raw = buffer.raw()
+        if raw.nbytes < _SHARED_MEMORY_THRESHOLD:
+            # Keep small buffers in-band
+            return True
+        segment = shared_memory.SharedMemory(create=True, size=max(raw.nbytes, 1))
+        segment.buf[:raw.nbytes] = raw
+        segments.append(segment)
+        return False
+
+    class AppPickler(cloudpickle.CloudPickler):
+        def persistent_id(self, obj):
+            if obj is app:
+                return "app"
+            elif obj is app.server:
+                return "server"
+            return None
+
+    out = io.BytesIO()
+    AppPickler(out, protocol=5, buffer_callback=buffer_callback).dump(definitions)
+    return out.getvalue(), segments
+
+
+def _loads(data, segment_specs, app):
+    """Inverse of _dumps, run in the subprocess. Returns the definitions and the
+    shared memory segments backing them, which must be kept alive alongside
+    them"""
+    from multiprocessing import resource_tracker, shared_memory
+
+    segments = []
+    buffers = []
+    for name, size in segment_specs:
+        # The kernel owns the segments, this process must not unlink them at exit
+        if sys.version_info >= (3, 13):
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            segment = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(segment._name, "shared_memory")
+        segments.append(segment)
+        buffers.append(segment.buf[:size])
+
+    class AppUnpickler(pickle.Unpickler):
+        def persistent_load(self, pid):
+            return {"app": app, "server": app.server}[pid]
+
+    definitions = AppUnpickler(io.BytesIO(data), buffers=buffers).load()
+    return definitions, segments
+
+
+def _app_definitions(app):
+    """Collect everything the subprocess needs to reproduce app's behavior"""
+    callback_map = {}
+    callback_list = []
+    try:
+        # Callbacks registered with dash.callback that haven't been merged into
+        # the app yet
+        from dash import _callback
+        callback_map.update(getattr(_callback, "GLOBAL_CALLBACK_MAP", {}))
+        callback_list.extend(getattr(_callback, "GLOBAL_CALLBACK_LIST", []))
+    except ImportError:
+        pass
+    callback_map.update(app.callback_map)
+    callback_list.extend(app._callback_list)
+
+    return {
+        "layout": app.layout,
+        "callback_map": callback_map,
+        "callback_list": callback_list,
+        "inline_scripts": list(getattr(app, "_inline_scripts", [])),
+        "callback_timeouts": dict(getattr(app, "_callback_timeouts", {})),
+    }
+
+
+def _captured_ids(func):
+    """ids of the global variables and closure cells referenced by func, and by
+    the functions nested in it, so that rebinding them can be detected"""
+    func = inspect.unwrap(func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return ()
+    func_globals = getattr(func, "__globals__", {})
+    names = set()
+    codes = [code]
+    while codes:
+        current = codes.pop()
+        names.update(current.co_names)
+        codes.extend(c for c in current.co_consts if isinstance(c, types.CodeType))
+
+    captured = [
+        (name, id(func_globals[name])) for name in sorted(names)
+        if name in func_globals
+    ]
+    for cell in func.__closure__ or ():
+        try:
+            captured.append((None, id(cell.cell_contents)))
+        except ValueError:
+            # Empty cell
+            pass
+    return tuple(captured)
+
+
+def _fingerprint(app):
+    """Cheap summary of app's definitions used to detect redefinitions, including
+    the identity of the variables that callbacks reference"""
+    return (
+        id(app.layout),
+        tuple(sorted(
+            (key, id(value.get("callback")), _captured_ids(value.get("callback")))
+            for key, value in app.callback_map.items()
+        )),
+    )
+
+
+class IsolatedServer(object):
+    """Kernel-side handle to a server subprocess.
+
+    The subprocess runs ``python -m jupyter_dash.isolated`` in its own session, so
+    that it survives kernel restarts, and serves the most recent app definition
+    sent by ``define``. A restarted kernel reconnects to it with ``find``, through
+    a state file holding the address and authentication key of its control
+    channel.
+    """
+    def __init__(self, host, port, state):
+        self.host = host
+        self.port = port
+        self.pid = state["pid"]
+        self._address = tuple(state["address"])
+        self._authkey = bytes.fromhex(state["authkey"])
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._options = None
+        # Flask server of the app being served, see JupyterDash.memory_report
+        self.app = None
+
+    @classmethod
+    def find(cls, host, port):
+        """Connect to a running server subprocess for host and port, if any"""
+        path = _state_path(host, port)
+        if not _private(path):
+            return None
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        server = cls(host, port, state)
+        if _pid_alive(server.pid):
+            try:
+                server._request("ping", timeout=5)
+                return server
+            except (OSError, EOFError):
+                pass
+
+        # Stale state from a server that has exited
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    @classmethod
+    def start(cls, host, port, timeout=30):
+        """Start a new server subprocess serving on host and port"""
+        path = _state_path(host, port)
+        log_path = path[:-len(".json")] + ".log"
+        # Make the modules importable by the kernel, which callbacks may reference,
+        # importable by the subprocess
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [p or os.getcwd() for p in sys.path if not p or os.path.isdir(p)]
+        )
+        fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as log:
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "jupyter_dash.isolated", host, str(port), path],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                cwd=os.getcwd(), env=env,
+                # Own session so that the server isn't killed with the kernel's
+                # process group on restart
+                start_new_session=True,
+            )
+
+        t0 = time.time()
+        while not os.path.exists(path):
+            if proc.poll() is not None:
+                with open(log_path) as f:
+                    output = f.read()
+                raise OSError(
+                    "The isolated server process for port {port} exited:\n"
+                    "{output}".format(port=port, output=output[-2000:])
+                )
+            if time.time() - t0 > timeout:
+                proc.kill()
+                raise OSError(
+                    "Timed out starting the isolated server process for port "
+                    "{port}".format(port=port)
+                )
+            time.sleep(0.05)
+
+        server = cls.find(host, port)
+        if server is None:
+            raise OSError(
+                "Unable to connect to the isolated server process for port "
+                "{port}".format(port=port)
+            )
+        return server
+
+    def _request(self, *message, timeout=60):
+        with self._lock:
+            conn = _connect(self._address, self._authkey, timeout)
+            try:
+                conn.send(message)
+                reply = conn.recv()
+            finally:
+                conn.close()
+        if reply[0] == "error":
+            raise RuntimeError(
+                "The isolated server process failed to apply the update:\n"
+                + reply[1]
+            )
+        return reply
+
+    def define(
+            self, app, dev_tools_args, token, inline_exceptions=False, warmup=0
+    ):
+        """Send app's configuration, layout and callbacks to the subprocess, which
+        starts serving them in place of any previous definition"""
+        options = dict(
+            dev_tools_args, token=token, inline_exceptions=inline_exceptions,
+            warmup=warmup,
+        )
+        config = {
+            key: app.config[key] for key in _FORWARDED_CONFIG if key in app.config
+        }
+        config["name"] = app.config.get("name")
+        config.update(getattr(app, "_init_options", {}))
+
+        data, segments = _dumps(app, _app_definitions(app))
+        try:
+            self._request(
+                "define", config, data,
+                [(segment.name, segment.size) for segment in segments],
+                dict(options),
+            )
+        finally:
+            # The subprocess has mapped the segments, so their names are no longer
+            # needed
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+        self.app = app.server
+        self._fingerprint = _fingerprint(app)
+        self._options = options
+
+    def sync(self, app):
+        """Resend app's definitions if its layout or callbacks changed since the
+        last call to define"""
+        if self._options is not None and _fingerprint(app) != self._fingerprint:
+            options = dict(self._options)
+            token = options.pop("token")
+            inline_exceptions = options.pop("inline_exceptions")
+            warmup = options.pop("warmup")
+            self.define(app, options, token, inline_exceptions, warmup)
+
+    def shutdown(self):
+        """Stop the subprocess"""
+        try:
+            self._request("shutdown")
+        except (OSError, EOFError):
+            pass
+        try:
+            os.remove(_state_path(self.host, self.port))
+        except OSError:
+            pass
+
+    def server_close(self):
+        pass
+
+
+def _watch_redefinitions(app, server):
+    """Resend app's definitions after every notebook cell that changes them"""
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    if shell is None:
+        return
+    watched = getattr(server, "_watched", None)
+    if watched is not None and watched() is app:
+        return
+
+    app_ref = weakref.ref(app)
+    server._watched = app_ref
+
+    def post_run_cell(*args):
+        app = app_ref()
+        if (app is None or server.app is not app.server or
+                app._servers.get((server.host, server.port)) is not server):
+            # The app is gone or no longer served by this subprocess
+            shell.events.unregister("post_run_cell", post_run_cell)
+            return
+        try:
+            server.sync(app)
+        except Exception as e:
+            print("Unable to update the isolated Dash server: {e}".format(e=e))
+
+    shell.events.register("post_run_cell", post_run_cell)
+
+
+class _AppSwitch(object):
+    """WSGI application delegating to the most recently defined app"""
+    def __init__(self):
+        self.app = None
+
+    def __call__(self, environ, start_response):
+        app = self.app
+        if app is None:
+            start_response("503 SERVICE UNAVAILABLE", [("Content-Type", "text/plain")])
+            return [b"Waiting for the app definition from the kernel"]
+        return app.server(environ, start_response)
+
+
+def _define(switch, config, data, segment_specs, options):
+    from .jupyter_app import JupyterDash
+
+    name = config.pop("name", None)
+    app = JupyterDash(name, **config)
+    definitions, segments = _loads(data, segment_specs, app)
+    # Keep the shared memory backing the app's data mapped for its lifetime
+    app._shared_segments = segments
+
+    app.layout = definitions["layout"]
+    app.callback_map.update(definitions["callback_map"])
+    app._callback_list.extend(definitions["callback_list"])
+    app._callback_timeouts.update(definitions["callback_timeouts"])
+    if hasattr(app, "_inline_scripts"):
+        app._inline_scripts.extend(
+            script for script in definitions["inline_scripts"]
+            if script not in app._inline_scripts
+        )
+
+    @app.server.route("/_alive_" + options.pop("token"), methods=["GET"])
+    def alive():
+        return "Alive"
+
+    inline_exceptions = options.pop("inline_exceptions", False)
+    warmup = options.pop("warmup", 0)
+    app._config_callback_exception_handling(
+        dev_tools_prune_errors=options.get("dev_tools_prune_errors") is not False,
+        inline_exceptions=inline_exceptions,
+    )
+    app.enable_dev_tools(**options)
+    switch.app = app
+
+    if warmup:
+        app._start_warmup(warmup, show_progress=False)
+
+
+def _main(host, port, state_path):
+    import logging
+    import secrets
+    import traceback
+
+    from werkzeug.serving import make_server
+
+    switch = _AppSwitch()
+    server = make_server(host, port, switch, threaded=True)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    authkey = secrets.token_bytes(32)
+    listener = Listener(("127.0.0.1", 0), authkey=authkey)
+
+    # Publish the control channel, atomically so that readers never see a
+    # partial file
+    tmp_path = state_path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({
+            "pid": os.getpid(),
+            "address": list(listener.address),
+            "authkey": authkey.hex(),
+        }, f)
+    os.replace(tmp_path, state_path)
+
+    def control():
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                continue
+            try:
+                message = conn.recv()
+                if message[0] == "define":
+                    try:
+                        _define(switch, *message[1:])
+                        conn.send(("ok",))
+                    except Exception:
+                        conn.send(("error", traceback.format_exc()))
+                elif message[0] == "shutdown":
+                    conn.send(("ok",))
+                    server.shutdown()
+                    return
+                else:
+                    conn.send(("ok", os.getpid()))
+            except Exception:
+                traceback.print_exc()
+            finally:
+                conn.close()
+
+    thread = threading.Thread(target=control)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        server.serve_forever()
+    finally:
+        listener.close()
+        try:
+            with open(state_path) as f:
+                owned = json.load(f).get("pid") == os.getpid()
+        except (OSError, ValueError):
+            owned = False
+        if owned:
+            os.remove(state_path)
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1], int(sys.argv[2]), sys.argv[3])
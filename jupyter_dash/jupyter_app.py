@@ -14,6 +14,10 @@ import traceback
 import threading
 import warnings
 import queue
+import weakref
+import collections
+import functools
+import html
 
 from IPython import get_ipython
 from IPython.display import IFrame, display
@@ -22,8 +26,27 @@ from ansi2html import Ansi2HTMLConverter
 import uuid
 
 from werkzeug.serving import make_server
-
+from dash.exceptions import PreventUpdate
+
+from .loadtest import run_load_test
+from .memory import _memory_report
+from .errors import ErrorRecord
+from .testing import CallbackTestClient
+from .isolated import IsolatedServer, _watch_redefinitions
+from .diffing import OutputDiffer
+from .warmup import ResponseCache, _WARMUP, _run_warmup
+from .scheduling import KernelAwareScheduler, _KERNEL_TOKEN_HEADER
+from .ratelimit import ClientRateLimiter, _BYPASS_LIMITS_HEADER
+from .timeouts import CallbackTimeout, _run_with_timeout
+from .uploads import UploadManager, _UPLOAD_SCRIPT
+from .assets import _SUITES_ROUTE, _shared_asset_server
+from .snapshot import export_snapshot
+from .refresh import _SHOW_PROTOCOL_VERSION, _SOFT_REFRESH_SCRIPT, _assets_hash
+from .testing import _IN_PROCESS
 from .comms import _dash_comm, _jupyter_config, _request_jupyter_config
+from .session_store import (
+    ServerSideStore, _issue_session_cookie, _persist_session_cookie
+)
 
 
 def _get_skip(error: Exception):
@@ -42,6 +65,40 @@ class JupyterDash(dash.Dash):
     :param server_url:  The base URL that the app will be served at, from the
         perspective of the client. If not specified, will default to the host argument
         passed to the ``run_server`` method.
+    :param session_store: The ``ServerSideStore`` used to hold large callback values
+        in the kernel, available as ``app.store``. If not specified, a store with
+        default size limits is created.
+    :param error_history_size: Number of rendered callback errors to keep in
+        ``app.errors``.
+    :param diff_outputs: If True, dict and list valued callback outputs (e.g.
+        figures) are sent to the browser as ``dash.Patch`` updates relative to the
+        value last sent to the same browser session, whenever the patch is smaller
+        than the full value. Assumes each browser session shows the app in a single
+        tab, and that these outputs are not modified by clientside callbacks.
+    :param scheduler: How callback requests are handled while a notebook cell is
+        executing, as a ``KernelAwareScheduler`` or the name of one of its policies
+        (``"queue"``, ``"shed"`` or ``"cap"``). Available as ``app.scheduler``. If
+        not specified, callbacks run concurrently with cells.
+    :param rate_limit: Number of callback requests per second allowed for each
+        browser session, e.g. to stop a single tab with a fast ``dcc.Interval`` from
+        saturating the server of an app shared with others. Excess requests receive
+        a 429 response.
+    :param rate_limit_burst: Number of callback requests each browser session may
+        make at once after being idle, e.g. when the page loads and fires its
+        initial callbacks. Defaults to ``rate_limit``, and at least 20.
+    :param max_in_flight: Maximum number of callback requests of each browser
+        session processed at once. Request counters are available from
+        ``app.rate_limiter.stats()`` when either limit is set.
+    :param callback_timeout: Number of seconds callbacks may run before being
+        cancelled, unless overridden by the ``timeout`` argument of
+        ``app.callback``. See ``jupyter_dash.check_cancelled``. The timed out
+        request is answered, and its ``scheduler`` slot and ``max_in_flight``
+        count released, one second after the timeout, while a callback that keeps
+        running is cancelled again every second for up to 10 more seconds.
+    :param uploads: Enables chunked file uploads streamed to disk, for elements
+        with a ``data-upload-target`` attribute. True, a dict of ``UploadManager``
+        arguments (e.g. ``max_file_bytes``), or an ``UploadManager``. Available as
+        ``app.uploads``, which is None if uploads are not enabled (the default).
 
     See parent docstring for additional parameters
     """
@@ -55,6 +112,7 @@ class JupyterDash(dash.Dash):
     _token = str(uuid.uuid4())
 
     _servers = {}
+    _instances = weakref.WeakSet()
 
     @classmethod
     def infer_jupyter_proxy_config(cls):
@@ -87,7 +145,53 @@ class JupyterDash(dash.Dash):
             # Assume classic notebook or JupyterLab
             _request_jupyter_config()
 
-    def __init__(self, name=None, server_url=None, **kwargs):
+    @classmethod
+    def memory_report(cls):
+        """
+        Report on the JupyterDash apps that are still alive in the kernel.
+
+        Re-running a cell that creates a new app does not free the previous app:
+        its background server keeps the app, its callbacks and all of the data
+        captured by their closures alive. The report lists every live app with its
+        running servers and the approximate memory it retains, and flags the apps
+        that are no longer reachable from the notebook's namespace.
+
+        Call ``reclaim()`` on the returned report to stop the servers of the
+        unreachable apps and release their memory.
+
+        :return: MemoryReport
+        """
+        return _memory_report(cls)
+
+    @classmethod
+    def _release(cls, app):
+        """Stop the servers of app and drop the data it retains"""
+        for address, server in list(cls._servers.items()):
+            if getattr(server, "app", None) is app.server:
+                server.shutdown()
+                server.server_close()
+                del cls._servers[address]
+        app._server_address = None
+        app._traceback = None
+        app._errors.clear()
+        app.store.clear()
+        if app.uploads is not None:
+            app.uploads.clear()
+
+        # dash.get_app() holds on to the most recently created app
+        try:
+            from dash import _get_app
+            if getattr(_get_app, "APP", None) is app:
+                _get_app.APP = None
+        except ImportError:
+            pass
+
+    def __init__(
+            self, name=None, server_url=None, session_store=None,
+            error_history_size=10, diff_outputs=False, scheduler=None,
+            rate_limit=None, rate_limit_burst=None, max_in_flight=None,
+            callback_timeout=None, uploads=None, **kwargs
+    ):
         """"""
         # Strip unsupported properties and warn
         if JupyterDash._in_colab:
@@ -108,6 +212,81 @@ class JupyterDash(dash.Dash):
         # Call superclass constructor
         super(JupyterDash, self).__init__(name=name, **kwargs)
 
+        JupyterDash._instances.add(self)
+
+        # Server-side store for values too large to round-trip through the browser
+        self.store = session_store if session_store is not None else ServerSideStore()
+        # Sessions start when the page loads, see ClientRateLimiter and
+        # UploadManager
+        self.server.after_request(_persist_session_cookie)
+        prefix = self.config.routes_pathname_prefix
+        self.server.before_request(_issue_session_cookie({
+            prefix, prefix + "<path:path>", prefix + "_dash-layout"
+        }))
+
+        # (host, port) of the background server, set by run
+        self._server_address = None
+
+        # Base URL of the kernel-wide asset server, set by run(shared_assets=True)
+        self._shared_assets_url = None
+
+        # Rendered callback errors, and the traceback of the most recent error when
+        # run(keep_traceback=True)
+        self._errors = collections.deque(maxlen=error_history_size)
+        self._traceback = None
+
+        # Options forwarded to the server process by run(isolate=True)
+        self._init_options = dict(
+            error_history_size=error_history_size, diff_outputs=diff_outputs,
+            rate_limit=rate_limit, rate_limit_burst=rate_limit_burst,
+            max_in_flight=max_in_flight, callback_timeout=callback_timeout,
+        )
+
+        # Timeouts in seconds of all callbacks, and of individual callbacks by
+        # output
+        self._callback_timeout = callback_timeout
+        self._callback_timeouts = {}
+
+        # Route callback requests through _wrap_callback_view so that responses
+        # can be post-processed
+        if isinstance(scheduler, str):
+            scheduler = KernelAwareScheduler(policy=scheduler)
+        self.scheduler = scheduler
+        self._output_differ = OutputDiffer() if diff_outputs else None
+        self._response_cache = None
+        callback_endpoint = prefix + "_dash-update-component"
+        self.server.view_functions[callback_endpoint] = self._wrap_callback_view(
+            self.server.view_functions[callback_endpoint]
+        )
+        if self._output_differ is not None:
+            self.server.before_request(
+                self._output_differ._reset_on_page_load(prefix + "_dash-layout")
+            )
+
+        # Chunked file uploads streamed to disk, see UploadManager
+        if uploads is True:
+            uploads = UploadManager()
+        elif isinstance(uploads, dict):
+            uploads = UploadManager(**uploads)
+        self.uploads = uploads or None
+        if self.uploads is not None:
+            self.uploads._install(self.server, prefix)
+            self._inline_scripts.append(_UPLOAD_SCRIPT)
+            self._init_options["uploads"] = dict(self.uploads._options)
+
+        # Lets the JupyterLab extension refresh the app without reloading the page
+        self._inline_scripts.append(_SOFT_REFRESH_SCRIPT)
+
+        # Per-session limits on callback requests
+        self.rate_limiter = None
+        if rate_limit is not None or max_in_flight is not None:
+            self.rate_limiter = ClientRateLimiter(
+                rate=rate_limit, burst=rate_limit_burst, max_in_flight=max_in_flight
+            )
+            self.rate_limiter._install(
+                self.server, callback_endpoint, self._bypasses_rate_limits
+            )
+
         if not JupyterDash._in_ipython:
             # Nothing else to do when not running in a Jupyter context
             return
@@ -119,8 +298,6 @@ class JupyterDash(dash.Dash):
         except Exception:
             self._server_proxy = False
 
-        self._traceback = None
-
         if ('base_subpath' in _jupyter_config and self._server_proxy and
                 JupyterDash.default_requests_pathname_prefix is None):
             JupyterDash.default_requests_pathname_prefix = (
@@ -156,6 +333,7 @@ class JupyterDash(dash.Dash):
     def run(
             self,
             mode=None, width="100%", height=650, inline_exceptions=None,
+            keep_traceback=False, isolate=False, warmup=False, shared_assets=False,
             **kwargs
     ):
         """
@@ -176,6 +354,38 @@ class JupyterDash(dash.Dash):
         :param inline_exceptions: If True, callback exceptions are displayed inline
             in the the notebook output cell. Defaults to True if mode=="inline",
             False otherwise.
+        :param keep_traceback: If True, the live traceback of the most recent
+            callback error is kept so that it can be inspected with ``%debug``. This
+            keeps every frame of the failing callback, and all of its local
+            variables, in memory until the next error. If False (the default), only
+            the rendered errors in ``app.errors`` are kept.
+        :param isolate: If True, serve the app from a separate process instead of a
+            background thread in the kernel. The server keeps responding while the
+            kernel is busy executing cells, and survives kernel restarts: running
+            the app again from the restarted kernel updates the existing server.
+            Layout and callback changes made in later cells are sent to the server
+            automatically, as are global variables used by callbacks that are
+            rebound (e.g. ``df = new_df``). Objects modified in place (e.g.
+            ``df["x"] = 0``) are not detected, run the app again to send them.
+            Large arrays captured by callbacks are shared with the server through
+            shared memory. Requires the ``cloudpickle`` package.
+        :param warmup: If True, or a maximum number of callback executions, the
+            callbacks with Inputs that have a finite set of options (Dropdown,
+            RadioItems and Checklist values) are executed for those options in a
+            background thread pool once the server is running. Their responses are
+            cached, so that the first user to select each option doesn't wait for
+            the computation. Only use with callbacks whose result depends solely on
+            their inputs and state. ``True`` uses a budget of 200 executions.
+        :param shared_assets: If True, the Dash renderer and component bundles are
+            served by a kernel-wide server at URLs derived from their content, with
+            immutable cache headers, so that the browser downloads them once for
+            all apps in the kernel rather than once per app and port. The server
+            listens on the same host as the app, on port 8049 (or the
+            ``JUPYTER_DASH_ASSETS_PORT`` environment variable) if free, so that
+            the cache survives kernel restarts; a port number can be passed
+            instead of True. If the port is taken, a free port is used and the
+            bundles are downloaded again after a restart. Not supported with
+            ``isolate=True`` or in Colab.
         :param kwargs: Additional keyword arguments to pass to the superclass
             ``Dash.run_server`` method.
         """
@@ -223,11 +433,21 @@ class JupyterDash(dash.Dash):
         if inline_exceptions is None:
             inline_exceptions = mode == "inline"
 
-        # Terminate any existing server using this port
+        # Maximum number of callback executions used to warm up the response cache.
+        # Responses cached by a previous run may be stale.
+        warmup = 200 if warmup is True else int(warmup or 0)
+        self._response_cache = None
+
+        # Terminate any existing server using this port, except for an isolated
+        # server that will be updated in place
         old_server = self._servers.get((host, port))
-        if old_server:
+        if old_server is None and isolate:
+            # May have been started before a kernel restart
+            old_server = IsolatedServer.find(host, port)
+        if old_server and not (isolate and isinstance(old_server, IsolatedServer)):
             old_server.shutdown()
-            del self._servers[(host, port)]
+            self._servers.pop((host, port), None)
+            old_server = None
 
         # Configure pathname prefix
         requests_pathname_prefix = self.config.get('requests_pathname_prefix', None)
@@ -256,6 +476,18 @@ class JupyterDash(dash.Dash):
             server_url=server_url, requests_pathname_prefix=requests_pathname_prefix
         )
 
+        # Reference component bundles from the kernel-wide asset server
+        self._shared_assets_url = None
+        if shared_assets:
+            if isolate or JupyterDash._in_colab:
+                warnings.warn(
+                    "shared_assets is not supported with isolate=True or in Colab"
+                )
+            else:
+                self._shared_assets_url = self._shared_assets_base_url(
+                    host, None if shared_assets is True else int(shared_assets)
+                )
+
         # Default the global "debug" flag to True
         debug = kwargs.pop('debug', True)
 
@@ -284,6 +516,7 @@ class JupyterDash(dash.Dash):
         self._config_callback_exception_handling(
             dev_tools_prune_errors=kwargs.get('dev_tools_prune_errors', True),
             inline_exceptions=inline_exceptions,
+            keep_traceback=keep_traceback,
         )
 
         dev_tools_args = dict(
@@ -317,32 +550,42 @@ class JupyterDash(dash.Dash):
 
         err_q = queue.Queue()
 
-        server = make_server(
-            host, port, self.server,
-            threaded=True,
-            processes=0
-        )
-        logging.getLogger("werkzeug").setLevel(logging.ERROR)
-
-        @retry(
-            stop_max_attempt_number=15,
-            wait_exponential_multiplier=100,
-            wait_exponential_max=1000
-        )
-        def run():
-            try:
-                server.serve_forever()
-            except SystemExit:
-                pass
-            except Exception as error:
-                err_q.put(error)
-                raise error
+        if isolate:
+            server = old_server or IsolatedServer.start(host, port)
+            server.define(
+                self, dev_tools_args, JupyterDash._token,
+                inline_exceptions=inline_exceptions,
+                warmup=warmup,
+            )
+            _watch_redefinitions(self, server)
+        else:
+            server = make_server(
+                host, port, self.server,
+                threaded=True,
+                processes=0
+            )
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
-        thread = threading.Thread(target=run)
-        thread.daemon = True
-        thread.start()
+            @retry(
+                stop_max_attempt_number=15,
+                wait_exponential_multiplier=100,
+                wait_exponential_max=1000
+            )
+            def run():
+                try:
+                    server.serve_forever()
+                except SystemExit:
+                    pass
+                except Exception as error:
+                    err_q.put(error)
+                    raise error
+
+            thread = threading.Thread(target=run)
+            thread.daemon = True
+            thread.start()
 
         self._servers[(host, port)] = server
+        self._server_address = (host, port)
 
         # Wait for server to start up
         alive_url = "http://{host}:{port}/_alive_{token}".format(
@@ -392,6 +635,9 @@ class JupyterDash(dash.Dash):
                 self._display_in_colab(dashboard_url, port, mode, width, height)
             else:
                 self._display_in_jupyter(dashboard_url, port, mode, width, height)
+
+            if warmup and not isolate:
+                self._start_warmup(warmup)
         except Exception as final_error:
             msg = str(final_error)
             if msg.startswith('<!'):
@@ -399,6 +645,183 @@ class JupyterDash(dash.Dash):
             else:
                 raise final_error
 
+    def load_test(
+            self, duration=10, concurrency=4, rate=None, max_requests=None,
+            callbacks=None, values=None, timeout=30, seed=None, bypass_limits=False
+    ):
+        """
+        Measure how the running app holds up under concurrent callback traffic.
+
+        Synthetic ``_dash-update-component`` requests are built from the app's
+        registered callbacks, using the initial layout values of each callback's
+        inputs and state. Inputs with a finite set of options (e.g. Dropdown,
+        RadioItems and Checklist values) are varied randomly across their options.
+        Requests are sent directly to the background server started by ``run``, so
+        no network access beyond the local host is required.
+
+        :param duration: Maximum number of seconds to run the test for
+        :param concurrency: Number of simultaneous clients
+        :param rate: Target total requests per second. If None, each client sends
+            its next request as soon as the previous one completes.
+        :param max_requests: Stop after this many requests
+        :param callbacks: Outputs of the callbacks to exercise, as keys of
+            ``app.callback_map``. Defaults to all callbacks that don't use
+            pattern-matching ids.
+        :param values: dict from ``"id.prop"`` strings to lists of values to
+            choose from for those inputs/state
+        :param timeout: Per-request timeout in seconds
+        :param seed: Seed for the random choice of callbacks and values
+        :param bypass_limits: If True, the requests are not subject to the app's
+            ``rate_limit`` and ``max_in_flight`` limits. By default they are, like
+            requests from the browser. Requests are never held back by the
+            ``scheduler``, since the cell running the load test keeps the kernel
+            busy.
+        :return: LoadTestReport with throughput, latency percentiles and error rate
+        """
+        if self._server_address is None:
+            raise RuntimeError(
+                "The app is not running, call run() before load_test()"
+            )
+        host, port = self._server_address
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+        url = "http://{host}:{port}{prefix}_dash-update-component".format(
+            host=host, port=port, prefix=self.config.routes_pathname_prefix
+        )
+        headers = {_KERNEL_TOKEN_HEADER: JupyterDash._token}
+        if bypass_limits:
+            headers[_BYPASS_LIMITS_HEADER] = "1"
+        return run_load_test(
+            self, url, duration=duration, concurrency=concurrency, rate=rate,
+            max_requests=max_requests, callbacks=callbacks, values=values,
+            timeout=timeout, seed=seed,
+            headers=headers,
+        )
+
+    def export_snapshot(
+            self, path, input_space=None, max_results=1000, processes=None
+    ):
+        """
+        Export the app as a static bundle that works without a running kernel.
+
+        The bundle in the directory path contains an ``index.html`` page, the
+        component bundles and assets it uses, and a table of callback results
+        precomputed for combinations of input values. A script in the page answers
+        the browser's callback requests from that table, so the bundle can be
+        served by any static file host, or opened from the file system.
+
+        Callbacks are precomputed for their initial inputs, and for the values in
+        input_space and the options of Dropdown, RadioItems and Checklist inputs,
+        within max_results. Results are looked up by input and state values, so
+        callbacks with State or with inputs updated by other callbacks are only
+        covered for the values precomputed. Other requests leave their outputs
+        unchanged.
+
+        :param path: Directory to write the bundle to
+        :param input_space: dict from ``"id.prop"`` strings to lists of values to
+            precompute callbacks for, in addition to the enumerable options found
+            in the layout.
+        :param max_results: Maximum number of callback executions
+        :param processes: Number of worker processes to execute callbacks in. The
+            workers are forked from the kernel, so they share the app and its data,
+            but forking a kernel with running threads (e.g. the servers of other
+            apps) can deadlock on locks they hold. If None (the default) or 1, or
+            where fork is not available, callbacks are executed in 4 threads.
+        :return: The path of the bundle's ``index.html``
+        """
+        results, errors = export_snapshot(
+            self, path, input_space=input_space, max_results=max_results,
+            processes=processes,
+        )
+        if errors:
+            warnings.warn(
+                "{errors} of {total} callback executions failed and were left out "
+                "of the snapshot".format(errors=errors, total=results + errors)
+            )
+        return os.path.join(path, "index.html")
+
+    def test_client(self):
+        """
+        Create a client that invokes the app's callbacks in-process.
+
+        Callbacks are executed through the app's Flask server directly, without
+        calling ``run`` or opening a socket, which makes it suitable for fast unit
+        tests of notebook dashboards:
+
+            client = app.test_client()
+            assert client.call(Output("out", "children"), ["a"]) == "You chose a"
+            client.batch(Output("out", "children"), [["a"], ["b"]], max_workers=4)
+
+        :return: CallbackTestClient
+        """
+        return CallbackTestClient(self)
+
+    def _shared_assets_base_url(self, host, port=None):
+        """URL of the kernel-wide asset server as seen by the browser, built the
+        same way as the URL of the app itself"""
+        port = _shared_asset_server.start(host, port)
+        if self.server_url is None and not JupyterDash.default_server_url:
+            return "http://{host}:{port}/".format(host=host, port=port)
+
+        # Behind a proxy, the asset server is addressed through its port
+        requests_pathname_prefix = None
+        if self._input_pathname_prefix is None:
+            requests_pathname_prefix = self.default_requests_pathname_prefix
+        if requests_pathname_prefix and "{port}" in requests_pathname_prefix:
+            server_url = (self.server_url or JupyterDash.default_server_url)
+            return server_url.rstrip("/") + requests_pathname_prefix.format(port=port)
+
+        warnings.warn(
+            "shared_assets is ignored, the asset server can't be addressed through "
+            "server_url {server_url}".format(
+                server_url=self.server_url or JupyterDash.default_server_url
+            )
+        )
+        return None
+
+    def _collect_and_register_resources(self, resources, *args, **kwargs):
+        srcs = super(JupyterDash, self)._collect_and_register_resources(
+            resources, *args, **kwargs
+        )
+        if self._shared_assets_url is None:
+            return srcs
+        return _shared_asset_server._rewrite(
+            srcs, self.config.requests_pathname_prefix + _SUITES_ROUTE,
+            self._shared_assets_url,
+        )
+
+    def callback(self, *_args, **_kwargs):
+        """
+        Register a callback, see the parent docstring.
+
+        :param timeout: Number of seconds the callback may run before being
+            cancelled, overriding the ``callback_timeout`` of the app. A callback
+            that times out responds with a 504 error, and its stack is recorded in
+            ``app.errors``.
+        """
+        timeout = _kwargs.pop("timeout", None)
+        # Dash adds the callback's outputs to callback_map before decorating
+        previous = {
+            key: value.get("callback") for key, value in self.callback_map.items()
+        }
+        decorator = super(JupyterDash, self).callback(*_args, **_kwargs)
+
+        @functools.wraps(decorator)
+        def register(func):
+            result = decorator(func)
+            for key, value in self.callback_map.items():
+                if previous.get(key) is not value.get("callback"):
+                    if previous.get(key) is not None:
+                        # Redefined, responses cached by warm-up are stale
+                        self._response_cache = None
+                    if timeout is None:
+                        self._callback_timeouts.pop(key, None)
+                    else:
+                        self._callback_timeouts[key] = timeout
+            return result
+
+        return register
+
     def _display_in_colab(self, dashboard_url, port, mode, width, height):
         from google.colab import output
         if mode == 'inline':
@@ -418,20 +841,182 @@ class JupyterDash(dash.Dash):
             ))
         elif mode == 'jupyterlab':
             # Update front-end extension
+            # The extension re-fetches only the layout and dependencies when the
+            # assets are unchanged since the tab was last loaded
             _dash_comm.send({
                 'type': 'show',
                 'port': port,
                 'url': dashboard_url,
+                'version': _SHOW_PROTOCOL_VERSION,
+                'assets_hash': _assets_hash(self),
             })
 
+    def _start_warmup(self, budget, show_progress=True):
+        """Execute callbacks over their enumerable inputs in the background,
+        seeding the response cache"""
+        self._response_cache = ResponseCache()
+
+        handle = None
+        if show_progress and JupyterDash._in_ipython:
+            handle = display(
+                HTML("<small>Warming up callbacks...</small>"), display_id=True
+            )
+
+        def progress(completed, total, errors, elapsed):
+            if handle is None or (completed < total and completed % 10):
+                return
+            if completed < total:
+                msg = "Warming up callbacks: {completed}/{total}".format(
+                    completed=completed, total=total
+                )
+            else:
+                msg = "Warmed up {total} callback results in {elapsed:.1f}s".format(
+                    total=total, elapsed=elapsed
+                )
+            if errors:
+                msg += " ({errors} failed)".format(errors=errors)
+            handle.update(HTML("<small>{msg}</small>".format(msg=msg)))
+
+        thread = threading.Thread(
+            target=_run_warmup, args=(self, budget), kwargs=dict(progress=progress)
+        )
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _wrap_callback_view(self, view):
+        view = self.server.ensure_sync(view)
+
+        def timed_view(*args, **kwargs):
+            body = flask.request.get_json(silent=True) or {}
+            output = body.get("output")
+            timeout = self._callback_timeouts.get(output, self._callback_timeout)
+            if timeout is None:
+                return view(*args, **kwargs)
+            try:
+                return _run_with_timeout(
+                    functools.partial(view, *args, **kwargs), output, timeout
+                )
+            except CallbackTimeout as e:
+                return self._timeout_response(e)
+
+        def scheduled_view(*args, **kwargs):
+            scheduler = self.scheduler
+            if scheduler is None or self._is_kernel_request():
+                return timed_view(*args, **kwargs)
+            if not scheduler.acquire():
+                return scheduler._rejected_response()
+            try:
+                return timed_view(*args, **kwargs)
+            finally:
+                scheduler.release()
+
+        def cached_view(*args, **kwargs):
+            cache = self._response_cache
+            response = None
+            if cache is not None:
+                body = flask.request.get_json(silent=True) or {}
+                if flask.request.environ.get(_WARMUP):
+                    try:
+                        response = scheduled_view(*args, **kwargs)
+                    except PreventUpdate:
+                        cache.put(body, b"")
+                        raise
+                    if response.status_code == 200:
+                        cache.put(body, response.get_data())
+                else:
+                    data = cache.get(body)
+                    if data == b"":
+                        raise PreventUpdate
+                    elif data is not None:
+                        response = flask.Response(data, mimetype="application/json")
+
+            if response is None:
+                response = scheduled_view(*args, **kwargs)
+            return response
+
+        @functools.wraps(view)
+        def dispatch(*args, **kwargs):
+            # In-process clients need full values, not patches
+            differ = self._output_differ
+            if differ is None or flask.request.environ.get(_IN_PROCESS):
+                return cached_view(*args, **kwargs)
+            token = differ._begin()
+            try:
+                return differ.process(cached_view(*args, **kwargs), token)
+            finally:
+                differ._end(token)
+
+        return dispatch
+
+    def _timeout_response(self, error):
+        """Report a timed out callback in the notebook and respond with a
+        structured error"""
+        report = "{error}, it was cancelled while executing:\n{stack}".format(
+            error=error, stack=error.stack
+        )
+        print(report)
+        self._errors.append(ErrorRecord(
+            callback=error.callback, exc_type=CallbackTimeout, exc_value=error,
+            tb=None, text=report,
+            html="<pre>{report}</pre>".format(report=html.escape(report)),
+        ))
+
+        response = flask.jsonify({
+            "error": {
+                "type": "CallbackTimeout",
+                "callback": error.callback,
+                "timeout": error.timeout,
+                "message": str(error),
+            }
+        })
+        response.status_code = 504
+        return response
+
+    @staticmethod
+    def _is_kernel_request():
+        """Whether the current request was made by the kernel itself, e.g. by a
+        test client, the warm-up phase or a load test"""
+        return bool(
+            flask.request.environ.get(_IN_PROCESS) or
+            flask.request.headers.get(_KERNEL_TOKEN_HEADER) == JupyterDash._token
+        )
+
+    @staticmethod
+    def _bypasses_rate_limits():
+        """Whether the current request is exempt from the rate limiter, i.e. made
+        in-process or by a load test with bypass_limits"""
+        return bool(
+            flask.request.environ.get(_IN_PROCESS) or (
+                flask.request.headers.get(_BYPASS_LIMITS_HEADER) and
+                JupyterDash._is_kernel_request()
+            )
+        )
+
+    @property
+    def errors(self):
+        """List of the most recent callback errors as ErrorRecord objects, oldest
+        first"""
+        return list(self._errors)
+
     def _config_callback_exception_handling(
-            self, dev_tools_prune_errors, inline_exceptions
+            self, dev_tools_prune_errors, inline_exceptions, keep_traceback=False
     ):
 
         @self.server.errorhandler(Exception)
         def _wrap_errors(error):
             """Install traceback handling for callbacks"""
-            self._traceback = sys.exc_info()[2]
+            exc_type, exc_value, tb = sys.exc_info()
+            if keep_traceback:
+                # Make the error available to %debug
+                self._traceback = tb
+                sys.last_type, sys.last_value, sys.last_traceback = (
+                    exc_type, exc_value, tb
+                )
+                if sys.version_info >= (3, 12):
+                    sys.last_exc = exc_value
+            else:
+                self._traceback = None
 
             # Compute number of stack frames to skip to get down to callback
             skip = _get_skip(error) if dev_tools_prune_errors else 0
@@ -477,6 +1062,13 @@ class JupyterDash(dash.Dash):
             # color
             html_str = re.sub("background-color:[^;]+;", "", html_str)
 
+            body = flask.request.get_json(silent=True)
+            self._errors.append(ErrorRecord(
+                callback=body.get("output") if isinstance(body, dict) else None,
+                exc_type=exc_type, exc_value=exc_value, tb=tb,
+                text=ansi_stacktrace, html=html_str,
+            ))
+
             return html_str, 500
 
     def run_server(
@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .introspection import (
+    _callback_specs, _callback_payload, _dep_key, _initial_values, _input_domains
+)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+class LoadTestReport(object):
+    """Results of ``JupyterDash.load_test``.
+
+    Latencies are in seconds. ``by_callback`` maps each exercised callback's output
+    to a dict of the same statistics computed for that callback alone.
+    """
+    def __init__(self, samples, duration, concurrency):
+        # samples is a list of (output, latency, ok) tuples
+        self.duration = duration
+        self.concurrency = concurrency
+        self.samples = samples
+        self.by_callback = {}
+
+        stats = self._stats(samples)
+        for name, value in stats.items():
+            setattr(self, name, value)
+
+        for output in sorted(set(s[0] for s in samples)):
+            self.by_callback[output] = self._stats(
+                [s for s in samples if s[0] == output]
+            )
+
+    def _stats(self, samples):
+        latencies = sorted(s[1] for s in samples)
+        errors = sum(1 for s in samples if not s[2])
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": float(errors) / len(samples) if samples else 0.0,
+            "throughput": len(samples) / self.duration if self.duration else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+        }
+
+    def __repr__(self):
+        def ms(value):
+            return "-" if value is None else "{:.1f}ms".format(value * 1000)
+
+        lines = [
+            "{requests} requests in {duration:.1f}s with concurrency "
+            "{concurrency}: {throughput:.1f} req/s, error rate {error_rate:.1%}".format(
+                requests=self.requests, duration=self.duration,
+                concurrency=self.concurrency, throughput=self.throughput,
+                error_rate=self.error_rate,
+            ),
+            "    latency p50={p50} p95={p95} p99={p99}".format(
+                p50=ms(self.p50), p95=ms(self.p95), p99=ms(self.p99)
+            ),
+        ]
+        for output, stats in self.by_callback.items():
+            lines.append(
+                "    {output}: {requests} requests, {errors} errors, "
+                "p50={p50} p95={p95} p99={p99}".format(
+                    output=output, requests=stats["requests"],
+                    errors=stats["errors"], p50=ms(stats["p50"]),
+                    p95=ms(stats["p95"]), p99=ms(stats["p99"]),
+                )
+            )
+        return "\n".join(lines)
+
+
+def run_load_test(
+        app, url, duration=10, concurrency=4, rate=None, max_requests=None,
+        callbacks=None, values=None, timeout=30, seed=None, headers=None
+):
+    """Drive the callbacks of app with synthetic requests and measure the results.
+
+    See ``JupyterDash.load_test`` for a description of the parameters. ``url`` is the
+    full URL of the ``_dash-update-component`` route of the running server, and
+    ``headers`` are added to every request.
+    """
+    specs = _callback_specs(app)
+    if callbacks is not None:
+        specs = [s for s in specs if s["output"] in callbacks]
+    if not specs:
+        raise ValueError("No callbacks available to load test")
+
+    initial = _initial_values(app, specs)
+    domains = _input_domains(app, specs)
+    for key, value in (values or {}).items():
+        domains[key] = list(value)
+
+    rng = random.Random(seed)
+
+    def make_payload():
+        spec = rng.choice(specs)
+        payload_values = dict(initial)
+        for dep in spec["inputs"] + spec["state"]:
+            domain = domains.get(_dep_key(dep))
+            if domain:
+                payload_values[_dep_key(dep)] = rng.choice(domain)
+        # Emulate a user interacting with a single input
+        changed = [_dep_key(rng.choice(spec["inputs"]))] if spec["inputs"] else []
+        return spec["output"], _callback_payload(spec, payload_values, changed)
+
+    lock = threading.Lock()
+    samples = []
+    start = time.perf_counter()
+    deadline = start + duration
+    schedule = {"next": start, "issued": 0}
+
+    def next_slot():
+        """Reserve the next request slot, returning False when the test is over"""
+        with lock:
+            if max_requests is not None and schedule["issued"] >= max_requests:
+                return False
+            now = time.perf_counter()
+            if now >= deadline:
+                return False
+            schedule["issued"] += 1
+            if rate is None:
+                return True
+            send_at = max(now, schedule["next"])
+            schedule["next"] = send_at + 1.0 / rate
+        if send_at >= deadline:
+            return False
+        time.sleep(max(0, send_at - time.perf_counter()))
+        return True
+
+    def worker():
+        session = requests.Session()
+        session.headers.update(headers or {})
+        while next_slot():
+            with lock:
+                output, payload = make_payload()
+            t0 = time.perf_counter()
+            try:
+                res = session.post(url, json=payload, timeout=timeout)
+                # 204 is the response to a callback raising PreventUpdate
+                ok = res.status_code in (200, 204)
+            except requests.RequestException:
+                ok = False
+            latency = time.perf_counter() - t0
+            with lock:
+                samples.append((output, latency, ok))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+    return LoadTestReport(samples, time.perf_counter() - start, concurrency)
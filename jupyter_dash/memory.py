@@ -0,0 +1,183 @@
+import gc
+import sys
+import types
+import weakref
+
+from IPython import get_ipython
+
+# IPython's output history keeps references to displayed values, these don't
+# count as the user holding on to an app
+_HISTORY_NAMES = {"_", "__", "___", "_oh", "Out", "In", "_ih", "_dh", "exit", "quit"}
+
+
+# Leaves of the object graph that can't refer to an app or hold much memory
+_ATOMIC_TYPES = (int, float, complex, bool, type(None))
+
+
+def _user_namespace_ids(stop=(), max_objects=1000000):
+    """Return the ids of objects reachable from the IPython user namespace, or None
+    when not running in IPython or if more than max_objects objects are reachable.
+
+    Objects in stop (e.g. the apps themselves) are included, but what they refer to
+    is not, unless it is also reachable by another path. Modules, library classes
+    and the IPython shell are not followed, since nearly everything in the kernel
+    is reachable through them.
+    """
+    shell = get_ipython()
+    if shell is None:
+        return None
+
+    stop_ids = set(id(obj) for obj in stop)
+    seen = set(id(module) for module in list(sys.modules.values()))
+    seen.update(
+        id(module.__dict__) for module in list(sys.modules.values())
+        if getattr(module, "__dict__", None) is not None
+    )
+    seen.update([id(shell), id(shell.user_ns)])
+
+    ids = set()
+    stack = []
+    for name, value in list(shell.user_ns.items()):
+        if name in _HISTORY_NAMES or (name.startswith("_") and name[1:].isdigit()):
+            continue
+        stack.append(value)
+
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _ATOMIC_TYPES):
+            continue
+        seen.add(id(current))
+        ids.add(id(current))
+        if len(ids) > max_objects:
+            return None
+        if id(current) in stop_ids:
+            continue
+        if isinstance(current, type) and current.__module__ != "__main__":
+            continue
+        stack.extend(gc.get_referents(current))
+    return ids
+
+
+def _shared_ids(roots):
+    """ids of objects that are shared by the whole kernel and must not be counted
+    towards any single app"""
+    shared = set(id(root) for root in roots)
+    for module in list(sys.modules.values()):
+        shared.add(id(module))
+        module_dict = getattr(module, "__dict__", None)
+        if module_dict is not None:
+            shared.add(id(module_dict))
+    shell = get_ipython()
+    if shell is not None:
+        shared.add(id(shell.user_ns))
+    return shared
+
+
+def _retained_size(obj, exclude, max_objects=1000000):
+    """Approximate the number of bytes reachable from obj, not counting objects in
+    exclude (a set of ids), modules or classes"""
+    seen = set(exclude)
+    seen.add(id(obj))
+    stack = [obj]
+    size = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        try:
+            size += sys.getsizeof(current)
+        except Exception:
+            pass
+
+        for referent in gc.get_referents(current):
+            if id(referent) in seen:
+                continue
+            if isinstance(referent, (type, types.ModuleType)):
+                continue
+            seen.add(id(referent))
+            stack.append(referent)
+    return size
+
+
+class MemoryReport(object):
+    """Memory held by the JupyterDash apps alive in the kernel.
+
+    ``apps`` is a list of dicts, one per live app, with the keys:
+        - ``app``: weak reference to the JupyterDash instance, so that holding on to
+          the report (e.g. in the notebook's output history) doesn't keep apps alive
+        - ``servers``: list of (host, port) tuples of running background servers
+        - ``retained_bytes``: approximate number of bytes reachable only through the
+          app, including its Flask server, callback closures and stored tracebacks,
+          but not objects that are also reachable from the notebook's namespace
+        - ``reachable``: whether the app can be reached from the notebook's
+          namespace. None when not running in IPython.
+    """
+    def __init__(self, cls, apps):
+        self._cls = cls
+        self.apps = apps
+
+    @property
+    def unreachable(self):
+        """Entries for apps that are only kept alive by JupyterDash internals"""
+        return [entry for entry in self.apps if entry["reachable"] is False]
+
+    def reclaim(self):
+        """Stop the servers of unreachable apps and release the memory they hold
+
+        :return: Approximate number of bytes released
+        """
+        freed = 0
+        for entry in self.unreachable:
+            app = entry["app"]()
+            if app is not None:
+                self._cls._release(app)
+                freed += entry["retained_bytes"]
+        app = None
+        self.apps = [entry for entry in self.apps if entry["reachable"] is not False]
+        gc.collect()
+        return freed
+
+    def __repr__(self):
+        lines = ["{n} live JupyterDash app(s)".format(n=len(self.apps))]
+        for entry in self.apps:
+            app = entry["app"]()
+            if app is None:
+                continue
+            lines.append(
+                "    {name} at {addr}: ~{mb:.1f} MB retained, servers={servers}{flag}"
+                .format(
+                    name=app.config.get("name"),
+                    addr=hex(id(app)),
+                    mb=entry["retained_bytes"] / (1024.0 * 1024.0),
+                    servers=entry["servers"],
+                    flag=", unreachable" if entry["reachable"] is False else "",
+                )
+            )
+        return "\n".join(lines)
+
+
+def _memory_report(cls):
+    gc.collect()
+    apps = list(cls._instances)
+    # Objects reachable from the notebook without going through an app, e.g. a
+    # DataFrame that is both a notebook variable and captured by a callback
+    reachable_ids = _user_namespace_ids(stop=apps)
+
+    # Don't count other apps, objects shared with the rest of the kernel, or
+    # objects the notebook holds on to, towards any single app. Releasing the app
+    # wouldn't free them.
+    exclude = _shared_ids(apps + [cls._servers, cls._instances])
+    if reachable_ids is not None:
+        exclude.update(reachable_ids)
+
+    entries = []
+    for app in apps:
+        servers = [
+            address for address, server in list(cls._servers.items())
+            if getattr(server, "app", None) is app.server
+        ]
+        entries.append({
+            "app": weakref.ref(app),
+            "servers": servers,
+            "retained_bytes": _retained_size(app, exclude),
+            "reachable": None if reachable_ids is None else id(app) in reachable_ids,
+        })
+    return MemoryReport(cls, entries)
@@ -0,0 +1,166 @@
+import collections
+import math
+import threading
+import time
+
+import flask
+
+from .session_store import _SESSION_COOKIE, _session_id, _valid_session_id
+
+
+# Sent along with the kernel's token by requests from the kernel that should not
+# be rate limited, see JupyterDash.load_test
+_BYPASS_LIMITS_HEADER = "X-Jupyter-Dash-Bypass-Limits"
+
+# Requests allowed at once by default, enough for the callbacks a page typically
+# fires when it loads
+_DEFAULT_BURST = 20
+
+
+def _client_key():
+    """Identify the client making the current request by its session cookie, or
+    by its remote address if it doesn't have one yet"""
+    sid = flask.request.cookies.get(_SESSION_COOKIE)
+    if _valid_session_id(sid):
+        return "session:" + sid
+    # Issue a session cookie with the response
+    _session_id()
+    return "address:" + str(flask.request.remote_addr)
+
+
+class _ClientState(object):
+    __slots__ = ("tokens", "updated", "in_flight", "allowed", "rejected")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.allowed = 0
+        self.rejected = 0
+
+
+class ClientRateLimiter(object):
+    """Per-client token-bucket rate limit and cap on in-flight requests for the
+    callback requests of an app.
+
+    Clients are identified by their session cookie (see ``ServerSideStore``), which
+    is issued with the app's page, or by their remote address if they don't have
+    one. Requests over the limits receive a
+    429 response with a Retry-After header, which the browser reports as a failed
+    callback. Configure with the ``rate_limit`` and ``max_in_flight`` arguments of
+    ``JupyterDash``.
+
+    :param rate: Sustained number of callback requests per second allowed for each
+        client, or None for no rate limit.
+    :param burst: Number of requests a client may make at once after being idle,
+        e.g. the initial callbacks of the page. Defaults to ``rate``, and at least
+        20.
+    :param max_in_flight: Maximum number of callback requests of each client being
+        processed at once, or None for no cap.
+    :param max_clients: Number of clients tracked at once. The least recently seen
+        clients are forgotten first.
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None, max_clients=1000):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(_DEFAULT_BURST, rate or 0)
+        self.max_in_flight = max_in_flight
+        self.max_clients = max_clients
+        self.allowed = 0
+        self.rejected = 0
+        self._clients = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _client(self, key):
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _ClientState(self.burst)
+            while len(self._clients) > self.max_clients:
+                # Don't forget clients with requests in flight, or their count
+                # would go negative when they finish
+                for old_key, old_client in self._clients.items():
+                    if not old_client.in_flight and old_key != key:
+                        del self._clients[old_key]
+                        break
+                else:
+                    break
+        else:
+            self._clients.move_to_end(key)
+        return client
+
+    def _admit(self, key):
+        """Return None if the client's request may proceed, otherwise the number of
+        seconds it should wait before retrying"""
+        with self._lock:
+            client = self._client(key)
+
+            if self.rate:
+                now = time.monotonic()
+                client.tokens = min(
+                    self.burst, client.tokens + (now - client.updated) * self.rate
+                )
+                client.updated = now
+                if client.tokens < 1:
+                    client.rejected += 1
+                    self.rejected += 1
+                    return (1 - client.tokens) / self.rate
+
+            if self.max_in_flight is not None and \
+                    client.in_flight >= self.max_in_flight:
+                client.rejected += 1
+                self.rejected += 1
+                return 1
+
+            if self.rate:
+                client.tokens -= 1
+            client.in_flight += 1
+            client.allowed += 1
+            self.allowed += 1
+            return None
+
+    def _finish(self, key):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                client.in_flight -= 1
+
+    def _install(self, server, endpoint, exempt):
+        """Register request hooks applying the limits to endpoint, except for
+        requests for which exempt() returns True"""
+        @server.before_request
+        def _limit_client():
+            if flask.request.endpoint != endpoint or exempt():
+                return None
+            key = _client_key()
+            retry_after = self._admit(key)
+            if retry_after is not None:
+                return flask.Response(
+                    "Too many requests", status=429, mimetype="text/plain",
+                    headers={"Retry-After": str(int(math.ceil(retry_after)))},
+                )
+            flask.g._jupyter_dash_client = key
+            return None
+
+        @server.teardown_request
+        def _release_client(exc=None):
+            key = flask.g.pop("_jupyter_dash_client", None)
+            if key is not None:
+                self._finish(key)
+
+    def stats(self):
+        """Return a dict of request counters, in total and for each tracked
+        client"""
+        with self._lock:
+            clients = {
+                key: {
+                    "allowed": client.allowed,
+                    "rejected": client.rejected,
+                    "in_flight": client.in_flight,
+                }
+                for key, client in self._clients.items()
+            }
+            return {
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "in_flight": sum(c["in_flight"] for c in clients.values()),
+                "clients": clients,
+            }
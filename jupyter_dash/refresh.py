@@ -0,0 +1,81 @@
+import hashlib
+import json
+import re
+
+# Version of the 'show' comm message sent to the JupyterLab extension. Version 1
+# adds the assets_hash field, used to decide whether the Dash tab can be soft
+# refreshed
+_SHOW_PROTOCOL_VERSION = 1
+
+# Included in the index page of every app so that the JupyterLab extension can
+# re-mount the Dash renderer, which fetches the layout and dependencies again and
+# reruns the initial callbacks, without reloading the page and its component
+# bundles. The root created by the renderer is captured so that it can be
+# unmounted first.
+_SOFT_REFRESH_SCRIPT = """
+(function () {
+    var ReactDOM = window.ReactDOM;
+    if (window.jupyterDashSoftRefresh || !ReactDOM) {
+        return;
+    }
+    var root = null;
+    var createRoot = ReactDOM.createRoot;
+    if (createRoot) {
+        ReactDOM.createRoot = function (container) {
+            var created = createRoot.apply(this, arguments);
+            if (container && container.id === 'react-entry-point') {
+                root = created;
+            }
+            return created;
+        };
+    }
+
+    window.jupyterDashSoftRefresh = function () {
+        var container = document.getElementById('react-entry-point');
+        if (root) {
+            root.unmount();
+            root = null;
+        } else if (ReactDOM.unmountComponentAtNode) {
+            ReactDOM.unmountComponentAtNode(container);
+        }
+        // Rerun the app's renderer script to mount a fresh renderer
+        (0, eval)(document.getElementById('_dash-renderer').textContent);
+    };
+})();
+"""
+
+
+# Config keys that change every time the page is rendered
+_VOLATILE_CONFIG_KEYS = ("end_id",)
+
+
+def _stable_config(config_html):
+    """The renderer config in config_html, without the keys that change on every
+    render"""
+    match = re.search(r">(.*)</script>", config_html, flags=re.S)
+    try:
+        config = json.loads(match.group(1))
+    except (AttributeError, ValueError):
+        return config_html
+    for key in _VOLATILE_CONFIG_KEYS:
+        config.pop(key, None)
+    return json.dumps(config, sort_keys=True)
+
+
+def _assets_hash(app):
+    """Hash of everything in app's index page other than its layout and
+    callbacks, i.e. what a soft refresh can't update"""
+    with app.server.test_request_context():
+        parts = [
+            app.index_string,
+            app.renderer,
+            app._generate_css_dist_html(),
+            app._generate_scripts_html(),
+            # The renderer reads its config from the page
+            _stable_config(app._generate_config_html()),
+        ]
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
@@ -0,0 +1,168 @@
+import collections
+import threading
+import time
+import weakref
+
+import flask
+from IPython import get_ipython
+
+from .loadtest import _percentile
+
+_POLICIES = ("queue", "shed", "cap")
+
+# Header carrying JupyterDash._token on requests made by the kernel itself (e.g.
+# load tests), which are never held back by the scheduler
+_KERNEL_TOKEN_HEADER = "X-Jupyter-Dash-Token"
+
+
+class _KernelActivity(object):
+    """Tracks whether the kernel is executing a cell, using IPython's
+    pre_run_cell/post_run_cell events"""
+    def __init__(self):
+        self.busy = False
+        self._schedulers = weakref.WeakSet()
+        self._registered = False
+        self._lock = threading.Lock()
+
+    def watch(self, scheduler):
+        with self._lock:
+            self._schedulers.add(scheduler)
+            if self._registered:
+                return
+            shell = get_ipython()
+            if shell is None:
+                return
+            shell.events.register("pre_run_cell", self._pre_run_cell)
+            shell.events.register("post_run_cell", self._post_run_cell)
+            self._registered = True
+
+    def _pre_run_cell(self, *args):
+        self._set_busy(True)
+
+    def _post_run_cell(self, *args):
+        self._set_busy(False)
+
+    def _set_busy(self, busy):
+        self.busy = busy
+        for scheduler in list(self._schedulers):
+            scheduler._kernel_state_changed()
+
+
+_kernel_activity = _KernelActivity()
+
+
+class KernelAwareScheduler(object):
+    """Prioritizes cell execution over dashboard callbacks while the kernel is
+    busy, since both compete for the kernel's GIL.
+
+    :param policy: What to do with callback requests that arrive while a cell is
+        executing. One of:
+        ``"queue"``: Hold requests until the cell finishes, up to ``max_queue``
+            waiting requests and ``queue_timeout`` seconds each.
+        ``"shed"``: Reject requests immediately with a 503 response and a
+            Retry-After header.
+        ``"cap"``: Run at most ``max_concurrent`` callbacks at a time, queueing
+            the rest as for ``"queue"``.
+    :param max_queue: Maximum number of requests waiting at once. Requests arriving
+        when the queue is full are rejected with a 503 response.
+    :param queue_timeout: Maximum number of seconds a request waits before being
+        rejected with a 503 response.
+    :param max_concurrent: Number of callbacks that may run at once under the
+        ``"cap"`` policy while a cell is executing.
+    :param retry_after: Seconds the browser is asked to wait in the Retry-After
+        header of 503 responses.
+    """
+    def __init__(
+            self, policy="queue", max_queue=32, queue_timeout=30, max_concurrent=1,
+            retry_after=2
+    ):
+        if policy not in _POLICIES:
+            raise ValueError(
+                "Invalid scheduling policy {policy}\n"
+                "    Valid policies: {valid}".format(
+                    policy=repr(policy), valid=_POLICIES
+                )
+            )
+        self.policy = policy
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._requests = 0
+        self._rejected = 0
+        self._queued = 0
+        self._waits = collections.deque(maxlen=1000)
+
+        _kernel_activity.watch(self)
+
+    def _kernel_state_changed(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def _must_wait(self):
+        if not _kernel_activity.busy:
+            return False
+        if self.policy == "cap":
+            return self._active >= self.max_concurrent
+        return True
+
+    def acquire(self):
+        """Wait for permission to run a callback. Returns False if the request
+        should be rejected, otherwise release must be called when done."""
+        t0 = time.time()
+        with self._condition:
+            self._requests += 1
+            if self._must_wait():
+                if self.policy == "shed" or self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    return False
+
+                self._queued += 1
+                self._waiting += 1
+                try:
+                    ready = self._condition.wait_for(
+                        lambda: not self._must_wait(), timeout=self.queue_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not ready:
+                    self._rejected += 1
+                    return False
+
+                self._waits.append(time.time() - t0)
+            self._active += 1
+        return True
+
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _rejected_response(self):
+        return flask.Response(
+            "The notebook kernel is busy, try again shortly",
+            status=503, mimetype="text/plain",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def stats(self):
+        """Return a dict of scheduling metrics. Wait times are in seconds and only
+        include requests that were queued."""
+        with self._condition:
+            waits = sorted(self._waits)
+            return {
+                "kernel_busy": _kernel_activity.busy,
+                "requests": self._requests,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "active": self._active,
+                "waiting": self._waiting,
+                "mean_wait": sum(waits) / len(waits) if waits else None,
+                "p50_wait": _percentile(waits, 50),
+                "p95_wait": _percentile(waits, 95),
+                "max_wait": waits[-1] if waits else None,
+            }
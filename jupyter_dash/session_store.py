@@ -0,0 +1,370 @@
+import collections
+import itertools
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+
+import flask
+
+_SESSION_COOKIE = "_jupyter_dash_session"
+_KERNEL_SESSION = "kernel"
+
+
+def _session_id():
+    """Return the id of the browser session making the current request.
+
+    Outside of a request (e.g. when called from a notebook cell) all values
+    belong to a single kernel-wide session.
+    """
+    if not flask.has_request_context():
+        return _KERNEL_SESSION
+
+    sid = getattr(flask.g, "_jupyter_dash_session", None)
+    if sid is None:
+        sid = flask.request.cookies.get(_SESSION_COOKIE)
+        if not _valid_session_id(sid):
+            sid = uuid.uuid4().hex
+        flask.g._jupyter_dash_session = sid
+    return sid
+
+
+def _valid_session_id(sid):
+    return bool(sid) and len(sid) == 32 and all(c in "0123456789abcdef" for c in sid)
+
+
+def _persist_session_cookie(response):
+    """after_request hook that hands new sessions their cookie"""
+    sid = getattr(flask.g, "_jupyter_dash_session", None)
+    if sid is not None and flask.request.cookies.get(_SESSION_COOKIE) != sid:
+        response.set_cookie(_SESSION_COOKIE, sid, httponly=True, samesite="Lax")
+    return response
+
+
+def _issue_session_cookie(endpoints):
+    """before_request hook starting a session when the page is loaded, so that the
+    requests the page makes afterwards, possibly concurrently, share its cookie"""
+    def issue():
+        if flask.request.endpoint in endpoints:
+            _session_id()
+    return issue
+
+
+def _approximate_size(value):
+    """Estimate the number of bytes held by value"""
+    # pandas objects
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(getattr(usage, "sum", lambda: usage)())
+        except Exception:
+            pass
+
+    # numpy arrays and pyarrow tables
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    return _estimated_size(value)
+
+
+def _estimated_size(value, depth=3, sample=100):
+    """Cheap estimate of the size of value, extrapolating the size of containers
+    from a sample of their items rather than serializing them"""
+    size = sys.getsizeof(value)
+    if depth == 0 or isinstance(value, (str, bytes, bytearray)):
+        return size
+    if isinstance(value, dict):
+        items = list(itertools.islice(value.items(), sample))
+        if items:
+            sampled = sum(
+                _estimated_size(k, depth - 1, sample) +
+                _estimated_size(v, depth - 1, sample) for k, v in items
+            )
+            size += sampled * len(value) // len(items)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(itertools.islice(value, sample))
+        if items:
+            sampled = sum(_estimated_size(v, depth - 1, sample) for v in items)
+            size += sampled * len(value) // len(items)
+    return size
+
+
+class _SpilledValue(object):
+    """A value that has been written to disk, loaded back lazily"""
+    def __init__(self, path, kind, size):
+        self.path = path
+        self.kind = kind
+        self.size = size
+
+    def load(self, as_arrow=False):
+        if self.kind == "arrow":
+            from pyarrow import feather
+            table = feather.read_table(self.path, memory_map=True)
+            # Converting to pandas copies the table into memory
+            return table if as_arrow else table.to_pandas()
+        elif self.kind == "numpy":
+            import numpy as np
+            return np.load(self.path, mmap_mode="r")
+        else:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _spill(value, directory, key):
+    """Write value to directory using the most efficient format available"""
+    if type(value).__name__ == "DataFrame" and type(value).__module__.startswith(
+        "pandas"
+    ):
+        try:
+            from pyarrow import feather
+            path = os.path.join(directory, key + ".arrow")
+            feather.write_feather(value, path, compression="uncompressed")
+            return _SpilledValue(path, "arrow", os.path.getsize(path))
+        except ImportError:
+            pass
+        except Exception:
+            # e.g. object columns that Arrow can't represent, fall back to pickle
+            pass
+
+    if type(value).__name__ == "ndarray" and type(value).__module__ == "numpy":
+        if value.dtype != object:
+            import numpy as np
+            path = os.path.join(directory, key + ".npy")
+            np.save(path, value, allow_pickle=False)
+            return _SpilledValue(path, "numpy", os.path.getsize(path))
+
+    path = os.path.join(directory, key + ".pickle")
+    with open(path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return _SpilledValue(path, "pickle", os.path.getsize(path))
+
+
+class _Session(object):
+    def __init__(self):
+        # key -> (value, size), ordered from least to most recently used
+        self.memory = collections.OrderedDict()
+        self.memory_bytes = 0
+        # key -> value, for values being written to disk
+        self.spilling = {}
+        # key -> _SpilledValue
+        self.disk = {}
+
+
+class ServerSideStore(object):
+    """Kernel-side storage for large callback values.
+
+    Rather than returning a large value (e.g. a filtered DataFrame) to a
+    ``dcc.Store`` component, which sends it to the browser and back on every
+    callback, a callback can ``put`` the value in this store and return the
+    lightweight handle instead. Callbacks that receive the handle as an Input or
+    State retrieve the value with ``get``.
+
+    Values are kept in kernel memory, namespaced by the browser session that
+    stored them. When a session exceeds ``max_session_bytes`` the least recently
+    used values are evicted, or written to ``spill_dir`` if one is provided.
+    DataFrames are spilled as uncompressed Arrow files and numpy arrays as
+    ``.npy`` files so that they can be memory mapped when read back (Arrow
+    spilling requires the ``pyarrow`` package); all other values are pickled.
+
+    :param max_session_bytes: Approximate number of bytes each session may hold
+        in memory before values are evicted.
+    :param max_sessions: Maximum number of sessions to retain. The least recently
+        active session is discarded when this is exceeded.
+    :param spill_dir: Directory to spill evicted values to. If True, a temporary
+        directory is created. If None (the default), evicted values are dropped.
+    """
+    def __init__(
+            self, max_session_bytes=256 * 1024 * 1024, max_sessions=100,
+            spill_dir=None
+    ):
+        self.max_session_bytes = max_session_bytes
+        self.max_sessions = max_sessions
+
+        self._owns_spill_dir = spill_dir is True
+        if spill_dir is True:
+            spill_dir = tempfile.mkdtemp(prefix="jupyter_dash_store_")
+        elif spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = spill_dir or None
+
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def put(self, value):
+        """Store value for the current session and return its handle
+
+        :param value: Any Python object
+        :return: A short string handle that can be returned from a callback in
+            place of value
+        """
+        sid = _session_id()
+        key = uuid.uuid4().hex
+        size = _approximate_size(value)
+
+        with self._lock:
+            session = self._get_session(sid)
+            if size > self.max_session_bytes:
+                if self.spill_dir is None:
+                    raise ValueError(
+                        "Value of approximately {size} bytes exceeds the session "
+                        "limit of {limit} bytes.\n"
+                        "    Increase max_session_bytes or provide a spill_dir"
+                        .format(size=size, limit=self.max_session_bytes)
+                    )
+                session.spilling[key] = value
+                victims = [key]
+            else:
+                session.memory[key] = (value, size)
+                session.memory_bytes += size
+                victims = self._evict(session, keep=key)
+
+        # Written outside of the lock, so that other sessions aren't blocked
+        self._spill_victims(sid, session, victims)
+        return "{sid}/{key}".format(sid=sid, key=key)
+
+    def get(self, handle, default=KeyError, as_arrow=False):
+        """Retrieve the value referenced by handle
+
+        :param handle: A handle returned by ``put``
+        :param default: Value to return if the handle is unknown or its value was
+            evicted. If not provided, a KeyError is raised instead.
+        :param as_arrow: If True, a DataFrame that was spilled to disk as Arrow is
+            returned as a ``pyarrow.Table`` memory mapped from the spill file,
+            without reading it into memory. By default it is converted back to a
+            DataFrame, which copies it into memory. Values held in memory are
+            always returned unchanged.
+        """
+        sid, _, key = str(handle).partition("/")
+        # Handles can only be redeemed by the session that created them, except
+        # from the notebook itself
+        if flask.has_request_context() and sid != _session_id():
+            sid = None
+
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None:
+                self._sessions.move_to_end(sid)
+                if key in session.memory:
+                    session.memory.move_to_end(key)
+                    return session.memory[key][0]
+                if key in session.spilling:
+                    return session.spilling[key]
+                spilled = session.disk.get(key)
+            else:
+                spilled = None
+
+        if spilled is not None:
+            return spilled.load(as_arrow=as_arrow)
+        if default is KeyError:
+            raise KeyError(
+                "No stored value for handle {handle}, it may have been "
+                "evicted".format(handle=repr(handle))
+            )
+        return default
+
+    def discard(self, handle):
+        """Remove the value referenced by handle, if present"""
+        sid, _, key = str(handle).partition("/")
+        # As for get, only the session that created the handle may discard it
+        if flask.has_request_context() and sid != _session_id():
+            return
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return
+            if key in session.memory:
+                session.memory_bytes -= session.memory.pop(key)[1]
+            elif key in session.spilling:
+                # Its file is removed once written
+                del session.spilling[key]
+            elif key in session.disk:
+                session.disk.pop(key).remove()
+
+    def clear(self):
+        """Remove all values from all sessions"""
+        with self._lock:
+            for sid in list(self._sessions):
+                self._drop_session(sid)
+
+    def stats(self):
+        """Return a dict summarizing the contents of the store"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_values": sum(len(s.memory) for s in self._sessions.values()),
+                "memory_bytes": sum(
+                    s.memory_bytes for s in self._sessions.values()
+                ),
+                "disk_values": sum(len(s.disk) for s in self._sessions.values()),
+                "disk_bytes": sum(
+                    v.size for s in self._sessions.values() for v in s.disk.values()
+                ),
+            }
+
+    def _get_session(self, sid):
+        session = self._sessions.get(sid)
+        if session is None:
+            session = self._sessions[sid] = _Session()
+            while len(self._sessions) > self.max_sessions:
+                self._drop_session(next(iter(self._sessions)))
+        else:
+            self._sessions.move_to_end(sid)
+        return session
+
+    def _drop_session(self, sid):
+        session = self._sessions.pop(sid)
+        for spilled in session.disk.values():
+            spilled.remove()
+
+    def _evict(self, session, keep):
+        """Evict the least recently used values of session until it fits its
+        limit. Returns the keys of the values to spill with _spill_victims."""
+        victims = []
+        while session.memory_bytes > self.max_session_bytes:
+            key = next(iter(session.memory))
+            if key == keep:
+                break
+            value, size = session.memory.pop(key)
+            session.memory_bytes -= size
+            if self.spill_dir is not None:
+                session.spilling[key] = value
+                victims.append(key)
+        return victims
+
+    def _spill_victims(self, sid, session, victims):
+        """Write the values being spilled to disk. Must be called without holding
+        the lock."""
+        for key in victims:
+            with self._lock:
+                if key not in session.spilling:
+                    continue
+                value = session.spilling[key]
+            try:
+                spilled = _spill(value, self.spill_dir, key)
+            except BaseException:
+                with self._lock:
+                    session.spilling.pop(key, None)
+                raise
+            with self._lock:
+                # Unless the value was discarded, or its session dropped, meanwhile
+                if key in session.spilling and self._sessions.get(sid) is session:
+                    del session.spilling[key]
+                    session.disk[key] = spilled
+                    continue
+                session.spilling.pop(key, None)
+            spilled.remove()
+
+    def __del__(self):
+        if self._owns_spill_dir and self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
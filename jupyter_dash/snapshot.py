@@ -0,0 +1,254 @@
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from dash._utils import to_json
+
+from .introspection import _callback_payload, _callback_specs, _initial_values
+from .testing import _IN_PROCESS
+from .warmup import _warmup_tasks
+
+# Installed before the Dash renderer loads. Answers the renderer's requests for
+# the layout, dependencies and callback results from the tables in SNAPSHOT, so
+# that the page works from any static file host, or from the file system.
+# Callback requests are looked up by their outputs and input/state values, and by
+# the inputs that triggered them if possible. Callbacks that weren't precomputed
+# leave their outputs unchanged.
+_SHIM_SCRIPT = """
+(function () {
+    var SNAPSHOT = %(snapshot)s;
+
+    function canonical(value) {
+        if (Array.isArray(value)) {
+            return '[' + value.map(canonical).join(',') + ']';
+        }
+        if (value !== null && typeof value === 'object') {
+            return '{' + Object.keys(value).sort().map(function (k) {
+                return JSON.stringify(k) + ':' + canonical(value[k]);
+            }).join(',') + '}';
+        }
+        return JSON.stringify(value === undefined ? null : value);
+    }
+
+    function requestKey(body, withTrigger) {
+        function values(deps) {
+            return (deps || []).map(function (d) {
+                return [d.id, d.property, d.value];
+            });
+        }
+        return canonical([
+            body.output,
+            values(body.inputs),
+            values(body.state),
+            withTrigger ? (body.changedPropIds || []).slice().sort() : null
+        ]);
+    }
+
+    var exact = {};
+    var loose = {};
+    SNAPSHOT.responses.forEach(function (entry) {
+        exact[requestKey(entry[0], true)] = entry;
+        var key = requestKey(entry[0], false);
+        if (!(key in loose)) {
+            loose[key] = entry;
+        }
+    });
+
+    function respond(status, body) {
+        return Promise.resolve(new Response(status === 204 ? null : body, {
+            status: status, headers: {'Content-Type': 'application/json'}
+        }));
+    }
+
+    var originalFetch = window.fetch;
+    window.fetch = function (input, init) {
+        var url = typeof input === 'string' ? input : input.url;
+        var path = url.split('?')[0];
+        if (/_dash-layout$/.test(path)) {
+            return respond(200, JSON.stringify(SNAPSHOT.layout));
+        }
+        if (/_dash-dependencies$/.test(path)) {
+            return respond(200, JSON.stringify(SNAPSHOT.dependencies));
+        }
+        if (/_dash-update-component$/.test(path)) {
+            var body = JSON.parse(init.body);
+            var entry = exact[requestKey(body, true)] ||
+                loose[requestKey(body, false)];
+            if (!entry) {
+                console.warn('No precomputed result for callback ' + body.output);
+                return respond(204);
+            }
+            return respond(entry[1], entry[2]);
+        }
+        return originalFetch.apply(this, arguments);
+    };
+})();
+"""
+
+_SCRIPT_NAME = "_jupyter-dash-snapshot.js"
+
+# State inherited by forked worker processes
+_fork_state = {}
+
+
+def _execute(payload):
+    """Run the JSON encoded callback request payload through the app's Flask
+    server. Returns (payload, status, body)."""
+    client = _fork_state.get("client")
+    if client is None:
+        client = _fork_state["client"] = _fork_state["app"].server.test_client()
+        client.environ_base[_IN_PROCESS] = True
+    res = client.post(
+        _fork_state["url"], data=payload, content_type="application/json"
+    )
+    return payload, res.status_code, res.get_data(as_text=True)
+
+
+def _compute_responses(app, payloads, processes):
+    url = app.config.routes_pathname_prefix + "_dash-update-component"
+    _fork_state.clear()
+    _fork_state.update(app=app, url=url)
+    try:
+        if processes and processes > 1 and \
+                "fork" in multiprocessing.get_all_start_methods():
+            # Workers inherit the app, its callbacks and their data by forking.
+            # Only on request, since forking a multithreaded kernel can deadlock
+            # on locks held by other threads.
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                return pool.map(_execute, payloads, chunksize=4)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            return list(pool.map(_execute, payloads))
+    finally:
+        _fork_state.clear()
+
+
+def _local_path(url):
+    """Path in the bundle of a resource served at url, relative to the app's
+    requests_pathname_prefix"""
+    from dash.fingerprint import check_fingerprint
+
+    path = url.split("?")[0]
+    directory, _, filename = path.rpartition("/")
+    filename, _ = check_fingerprint(filename)
+    return (directory + "/" if directory else "") + filename
+
+
+def _export_resource(client, route, path, target):
+    res = client.get(route)
+    if res.status_code != 200:
+        return False
+    local = os.path.join(target, *path.split("/"))
+    os.makedirs(os.path.dirname(local), exist_ok=True)
+    with open(local, "wb") as f:
+        f.write(res.get_data())
+    return True
+
+
+def export_snapshot(app, path, input_space=None, max_results=1000, processes=None):
+    """Write a static bundle of app to the directory path.
+
+    See ``JupyterDash.export_snapshot`` for a description of the parameters.
+
+    :return: (number of precomputed callback results, number of callbacks that
+        failed)
+    """
+    os.makedirs(path, exist_ok=True)
+    requests_prefix = app.config.requests_pathname_prefix
+    routes_prefix = app.config.routes_pathname_prefix
+
+    client = app.server.test_client()
+    client.environ_base[_IN_PROCESS] = True
+    # Reference the component bundles from the app's own server rather than the
+    # kernel's shared asset server, so that they are copied into the bundle
+    shared_assets_url = app._shared_assets_url
+    app._shared_assets_url = None
+    try:
+        index = client.get(routes_prefix).get_data(as_text=True)
+    finally:
+        app._shared_assets_url = shared_assets_url
+    layout = client.get(routes_prefix + "_dash-layout").get_data(as_text=True)
+    dependencies = client.get(
+        routes_prefix + "_dash-dependencies"
+    ).get_data(as_text=True)
+
+    # Scripts, stylesheets and assets referenced by the index page are copied with
+    # paths relative to the page
+    def copy_resource(match):
+        attr, url = match.group(1), match.group(2)
+        if not url.startswith(requests_prefix):
+            return match.group(0)
+        local = _local_path(url[len(requests_prefix):])
+        if not _export_resource(client, routes_prefix + local, local, path):
+            return match.group(0)
+        return '{attr}="{local}"'.format(attr=attr, local=local)
+
+    index = re.sub(r'(src|href)="([^"]*)"', copy_resource, index)
+
+    # Files loaded by component bundles on demand, e.g. async chunks. Source maps
+    # are left out.
+    for namespace, rel_paths in app.registered_paths.items():
+        for rel_path in rel_paths:
+            if rel_path.endswith(".map"):
+                continue
+            local = "_dash-component-suites/{namespace}/{rel_path}".format(
+                namespace=namespace, rel_path=rel_path
+            )
+            if not os.path.exists(os.path.join(path, *local.split("/"))):
+                _export_resource(client, routes_prefix + local, local, path)
+
+    # Point the renderer at the page's own directory, without dev tools
+    def static_config(match):
+        config = json.loads(match.group(2))
+        config["requests_pathname_prefix"] = "./"
+        config["ui"] = False
+        config.pop("hot_reload", None)
+        return '{start}{config}</script>'.format(
+            start=match.group(1), config=json.dumps(config)
+        ) + '<script src="{script}"></script>'.format(script=_SCRIPT_NAME)
+
+    index = re.sub(
+        r'(<script id="_dash-config"[^>]*>)(.*?)</script>', static_config, index,
+        count=1, flags=re.S,
+    )
+
+    # Precompute callback results over the input space
+    specs = _callback_specs(app)
+    specs_by_output = {spec["output"]: spec for spec in specs}
+    initial = _initial_values(app, specs)
+    tasks = _warmup_tasks(app, max_results, domains=input_space)
+    # Initial calls of callbacks without enumerable inputs, made on page load
+    covered = {output for output, _, _ in tasks}
+    tasks += [(spec["output"], {}, []) for spec in specs if spec["output"] not in covered]
+
+    payloads = []
+    for output, inputs, triggered in tasks:
+        values = dict(initial)
+        values.update(inputs)
+        # Encoded as the browser would, layout values may be e.g. figures
+        payloads.append(to_json(
+            _callback_payload(specs_by_output[output], values, triggered)
+        ))
+
+    responses = []
+    errors = 0
+    for payload, status, body in _compute_responses(app, payloads, processes):
+        if status in (200, 204):
+            responses.append("[{payload},{status},{body}]".format(
+                payload=payload, status=status, body=json.dumps(body)
+            ))
+        else:
+            errors += 1
+
+    snapshot = '{{"layout": {layout}, "dependencies": {dependencies}, ' \
+        '"responses": [{responses}]}}'.format(
+            layout=layout, dependencies=dependencies,
+            responses=",\n".join(responses),
+        )
+    with open(os.path.join(path, _SCRIPT_NAME), "w", encoding="utf-8") as f:
+        f.write(_SHIM_SCRIPT % {"snapshot": snapshot})
+    with open(os.path.join(path, "index.html"), "w", encoding="utf-8") as f:
+        f.write(index)
+
+    return len(responses), errors
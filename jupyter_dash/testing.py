@@ -0,0 +1,151 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import flask
+
+from .introspection import (
+    _callback_specs, _callback_payload, _dep_key, _decode_response, _find_spec,
+    _initial_values
+)
+
+# WSGI environ key marking requests made in-process rather than over HTTP
+_IN_PROCESS = "jupyter_dash.in_process"
+
+
+class CallbackError(Exception):
+    """Raised by CallbackTestClient when a callback request fails without the
+    original exception being available"""
+    def __init__(self, message, status_code, body):
+        super(CallbackError, self).__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class CallbackTestClient(object):
+    """Execute an app's callbacks in-process through its Flask server.
+
+    Requests are handled by the Flask test client, so no server needs to be
+    running and no sockets are used. Create with ``JupyterDash.test_client()``.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._client = app.server.test_client()
+        self._client.environ_base[_IN_PROCESS] = True
+        self._exceptions = threading.local()
+        flask.got_request_exception.connect(
+            self._record_exception, sender=app.server
+        )
+
+    def _record_exception(self, sender, exception, **extra):
+        self._exceptions.last = exception
+
+    def _url(self, route):
+        return self.app.config.routes_pathname_prefix + route
+
+    def layout(self):
+        """Return the layout served to the browser, as JSON"""
+        return self._client.get(self._url("_dash-layout")).get_json()
+
+    def dependencies(self):
+        """Return the callback dependencies served to the browser, as JSON"""
+        return self._client.get(self._url("_dash-dependencies")).get_json()
+
+    def call(self, output, inputs=None, state=None, triggered=None):
+        """Invoke the callback that updates output and return its decoded result.
+
+        :param output: The callback to invoke, as an Output, a list of Outputs, an
+            ``app.callback_map`` key or the decorated function.
+        :param inputs: Values of the callback's Inputs, either as a list in the
+            order they were declared or as a dict from ``"id.prop"`` strings to
+            values. Inputs that are not provided take their value from the initial
+            layout.
+        :param state: Values of the callback's State, in the same form as inputs.
+        :param triggered: List of ``"id.prop"`` strings to report as having
+            triggered the callback in ``dash.callback_context``. Defaults to the
+            inputs that were provided, or all inputs if none were.
+        :return: The value of the output, or a tuple of values for callbacks with
+            multiple outputs. Outputs that were not updated are ``dash.no_update``.
+        :raises dash.exceptions.PreventUpdate: If the callback prevented the update
+        """
+        specs = _callback_specs(self.app)
+        spec = _find_spec(specs, output)
+
+        values = _initial_values(self.app, [spec])
+        provided_inputs = self._named(spec["inputs"], inputs)
+        values.update(provided_inputs)
+        values.update(self._named(spec["state"], state))
+
+        if triggered is None and provided_inputs:
+            triggered = list(provided_inputs)
+
+        payload = _callback_payload(spec, values, triggered)
+        return self._dispatch(spec, payload)
+
+    def batch(
+            self, output, input_sets, state=None, max_workers=None,
+            return_exceptions=False
+    ):
+        """Invoke a callback once for each set of inputs.
+
+        :param output: The callback to invoke, as accepted by ``call``
+        :param input_sets: Iterable of inputs, each as accepted by ``call``
+        :param state: State shared by every invocation
+        :param max_workers: Number of threads to invoke callbacks from. Defaults to
+            invoking them sequentially.
+        :param return_exceptions: If True, exceptions (including PreventUpdate)
+            are returned in place of the corresponding results instead of raised.
+        :return: List of results, in the order of input_sets
+        """
+        def invoke(inputs):
+            try:
+                return self.call(output, inputs=inputs, state=state)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        input_sets = list(input_sets)
+        if not max_workers or max_workers <= 1:
+            return [invoke(inputs) for inputs in input_sets]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(invoke, input_sets))
+
+    def _named(self, deps, values):
+        if values is None:
+            return {}
+        if isinstance(values, dict):
+            return dict(values)
+        values = list(values)
+        if len(values) != len(deps):
+            raise ValueError(
+                "Expected {n} values for {deps}, received {m}".format(
+                    n=len(deps), deps=[_dep_key(d) for d in deps], m=len(values)
+                )
+            )
+        return {_dep_key(dep): value for dep, value in zip(deps, values)}
+
+    def _dispatch(self, spec, payload):
+        from dash.exceptions import PreventUpdate
+
+        self._exceptions.last = None
+        res = self._client.post(self._url("_dash-update-component"), json=payload)
+
+        if res.status_code == 204:
+            raise PreventUpdate
+        if res.status_code != 200:
+            exception = self._exceptions.last
+            self._exceptions.last = None
+            if exception is not None:
+                raise exception
+
+            # Errors handled by run's inline exception handling are recorded
+            message = "Callback {output} failed with status {status}".format(
+                output=spec["output"], status=res.status_code
+            )
+            errors = self.app.errors
+            if errors and errors[-1].callback == spec["output"]:
+                message += ": {exc_type}: {msg}".format(
+                    exc_type=errors[-1].exc_type, msg=errors[-1].message
+                )
+            raise CallbackError(message, res.status_code, res.get_data(as_text=True))
+        return _decode_response(spec, res.get_json()["response"])
@@ -0,0 +1,147 @@
+import contextvars
+import ctypes
+import sys
+import threading
+import traceback
+
+_local = threading.local()
+
+
+class CallbackCancelled(BaseException):
+    """Raised inside a callback that exceeded its timeout, by ``check_cancelled``
+    or asynchronously when the callback doesn't stop by itself.
+
+    Like ``KeyboardInterrupt``, it derives from ``BaseException`` so that
+    ``except Exception`` clauses in callbacks don't stop the cancellation.
+    """
+
+
+class CallbackTimeout(Exception):
+    """A callback didn't finish within its timeout
+
+    :ivar callback: Output of the callback, as a key of app.callback_map
+    :ivar timeout: The timeout, in seconds
+    :ivar stack: Formatted stack of the callback when its timeout expired
+    """
+    def __init__(self, callback, timeout, stack):
+        super(CallbackTimeout, self).__init__(
+            "Callback {callback} exceeded its timeout of {timeout}s".format(
+                callback=callback, timeout=timeout
+            )
+        )
+        self.callback = callback
+        self.timeout = timeout
+        self.stack = stack
+
+
+def check_cancelled():
+    """Raise CallbackCancelled if the callback running in the current thread has
+    exceeded its timeout.
+
+    Long-running callbacks can call this periodically, e.g. once per iteration of
+    a loop, to stop promptly and release their resources when cancelled. Does
+    nothing outside of a callback with a timeout.
+    """
+    cancelled = getattr(_local, "cancelled", None)
+    if cancelled is not None and cancelled.is_set():
+        raise CallbackCancelled("Callback exceeded its timeout")
+
+
+def _raise_in_thread(thread, exc_type):
+    """Asynchronously raise exc_type in thread. The exception is raised when the
+    thread next executes Python bytecode, so blocking calls into C code are not
+    interrupted."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread.ident), ctypes.py_object(exc_type)
+    )
+
+
+def _cancel_in_background(thread, finished, interval, retries):
+    """Raise CallbackCancelled in thread until it exits, at most retries times,
+    from a watcher thread so that the caller can respond immediately.
+
+    finished is a [lock, flag] pair, whose flag the worker sets, holding the lock,
+    once its callback returns. Exceptions are only raised while holding the lock
+    and before the flag is set, so that they can't reach the worker after it has
+    left the callback, or another thread that reuses its id.
+    """
+    lock = finished[0]
+
+    def cancel():
+        for _ in range(retries):
+            with lock:
+                if finished[1] or not thread.is_alive():
+                    return
+                _raise_in_thread(thread, CallbackCancelled)
+            thread.join(interval)
+
+    watcher = threading.Thread(target=cancel, name="jupyter_dash-cancel")
+    watcher.daemon = True
+    watcher.start()
+
+
+def _thread_stack(thread):
+    """Format the current stack of thread, starting at the user's callback"""
+    frame = sys._current_frames().get(thread.ident)
+    if frame is None:
+        return ""
+    entries = traceback.format_stack(frame)
+    for i, entry in enumerate(entries):
+        if "%% callback invoked %%" in entry:
+            entries = entries[i + 1:] or entries
+            break
+    return "".join(entries)
+
+
+def _run_with_timeout(func, callback, timeout, grace=1.0, retries=10):
+    """Call func in a worker thread and return its result, raising CallbackTimeout
+    if it takes longer than timeout seconds.
+
+    The worker runs in a copy of the current context, so that it shares the Flask
+    request (and flask.g) of the calling thread. On timeout, the worker is first
+    asked to stop through check_cancelled, and CallbackCancelled is raised in it
+    asynchronously if it is still running after grace seconds. The exception is
+    raised again every grace seconds, up to retries times, in case the callback
+    catches it. CallbackTimeout is raised without waiting for the worker to exit,
+    so a callback that ignores cancellation may keep running for up to retries
+    more grace periods after the caller has responded.
+    """
+    context = contextvars.copy_context()
+    cancelled = threading.Event()
+    finished = [threading.Lock(), False]
+    outcome = {}
+
+    def target():
+        _local.cancelled = cancelled
+        try:
+            try:
+                outcome["result"] = context.run(func)
+            except CallbackCancelled:
+                pass
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                with finished[0]:
+                    finished[1] = True
+        except CallbackCancelled:
+            # Raised just as the callback returned
+            pass
+        finally:
+            _local.cancelled = None
+
+    worker = threading.Thread(target=target, name="jupyter_dash-callback")
+    worker.daemon = True
+    worker.start()
+    worker.join(timeout)
+
+    if worker.is_alive():
+        stack = _thread_stack(worker)
+        cancelled.set()
+        worker.join(grace)
+        if worker.is_alive():
+            _cancel_in_background(worker, finished, grace, retries)
+        raise CallbackTimeout(callback, timeout, stack)
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
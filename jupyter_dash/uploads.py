@@ -0,0 +1,401 @@
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import unquote
+
+import flask
+
+from .session_store import _session_id, _valid_session_id
+
+_UPLOAD_ROUTE = "_jupyter-dash-upload/"
+
+# Read size used when streaming request bodies to disk
+_READ_SIZE = 1024 * 1024
+
+# Client-side helper, included in the index page of every app. Clicking (or
+# dropping files onto) an element with a data-upload-target attribute uploads the
+# chosen files in chunks, then sets the data prop of the target component (e.g. a
+# dcc.Store) to {handle, filename, size}, or to a list of those if the element
+# also has a data-upload-multiple attribute
+_UPLOAD_SCRIPT = """
+(function () {
+    if (window.jupyterDashUpload) {
+        return;
+    }
+    var CHUNK_SIZE = 8 * 1024 * 1024;
+
+    function uploadUrl(uploadId) {
+        var config = JSON.parse(
+            document.getElementById('_dash-config').textContent
+        );
+        return config.requests_pathname_prefix + '%(route)s' + uploadId;
+    }
+
+    function newUploadId() {
+        var bytes = new Uint8Array(16);
+        window.crypto.getRandomValues(bytes);
+        return Array.prototype.map.call(bytes, function (b) {
+            return ('0' + b.toString(16)).slice(-2);
+        }).join('');
+    }
+
+    async function upload(file) {
+        var url = uploadUrl(newUploadId());
+        var offset = 0;
+        do {
+            var chunk = file.slice(offset, offset + CHUNK_SIZE);
+            var res = await fetch(url, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'X-Upload-Offset': String(offset),
+                    'X-Upload-Filename': encodeURIComponent(file.name)
+                },
+                body: chunk
+            });
+            if (!res.ok) {
+                throw new Error('Upload of ' + file.name + ' failed: ' + res.status);
+            }
+            offset += chunk.size;
+        } while (offset < file.size);
+
+        var done = await fetch(url + '/complete', {
+            method: 'POST', credentials: 'same-origin'
+        });
+        if (!done.ok) {
+            throw new Error('Upload of ' + file.name + ' failed: ' + done.status);
+        }
+        return done.json();
+    }
+
+    window.jupyterDashUpload = upload;
+
+    function uploadTo(element, files) {
+        var multiple = element.hasAttribute('data-upload-multiple');
+        files = Array.prototype.slice.call(files, 0, multiple ? undefined : 1);
+        if (!files.length) {
+            return;
+        }
+        Promise.all(files.map(upload)).then(
+            function (results) {
+                window.dash_clientside.set_props(
+                    element.getAttribute('data-upload-target'),
+                    {data: multiple ? results : results[0]}
+                );
+            },
+            function (err) {
+                console.error(err);
+            }
+        );
+    }
+
+    function uploadElement(event) {
+        return event.target.closest && event.target.closest('[data-upload-target]');
+    }
+
+    document.addEventListener('click', function (event) {
+        var element = uploadElement(event);
+        if (!element) {
+            return;
+        }
+        var input = document.createElement('input');
+        input.type = 'file';
+        input.multiple = element.hasAttribute('data-upload-multiple');
+        input.accept = element.getAttribute('data-upload-accept') || '';
+        input.addEventListener('change', function () {
+            uploadTo(element, input.files);
+        });
+        input.click();
+    });
+
+    document.addEventListener('dragover', function (event) {
+        if (uploadElement(event)) {
+            event.preventDefault();
+        }
+    });
+
+    document.addEventListener('drop', function (event) {
+        var element = uploadElement(event);
+        if (element) {
+            event.preventDefault();
+            uploadTo(element, event.dataTransfer.files);
+        }
+    });
+})();
+""" % {"route": _UPLOAD_ROUTE}
+
+
+class UploadedFile(object):
+    """A file uploaded through ``JupyterDash.uploads``
+
+    :ivar path: Path of the uploaded data on disk
+    :ivar filename: Name of the file on the client
+    :ivar size: Size in bytes
+    """
+    def __init__(self, path, filename, size):
+        self.path = path
+        self.filename = filename
+        self.size = size
+
+    def open(self, mode="rb"):
+        """Open the uploaded data for reading"""
+        return open(self.path, mode)
+
+    def mmap(self):
+        """Memory map the uploaded data read-only, e.g. to parse it with
+        ``pandas.read_csv`` or ``numpy.frombuffer`` without copying it into memory.
+        Empty files are returned as ``b""``, since they can't be mapped."""
+        if self.size == 0:
+            return b""
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return "<UploadedFile {filename} ({size} bytes)>".format(
+            filename=repr(self.filename), size=self.size
+        )
+
+
+class _PartialUpload(object):
+    """An upload whose chunks are still being received"""
+    __slots__ = ("uploaded", "lock", "updated")
+
+    def __init__(self, uploaded):
+        self.uploaded = uploaded
+        # Held while a chunk is checked and written, so that chunks of the same
+        # upload can't interleave
+        self.lock = threading.Lock()
+        self.updated = time.monotonic()
+
+
+class UploadManager(object):
+    """Receives files uploaded in chunks by the browser and streams them to disk.
+
+    ``dcc.Upload`` sends file contents base64 encoded inside the callback request,
+    which inflates large files by a third and materializes them several times in
+    the kernel. Instead, an app created with ``JupyterDash(uploads=True)`` can give
+    any element a ``data-upload-target`` attribute naming a ``dcc.Store``:
+
+        html.Button("Upload CSV", **{
+            "data-upload-target": "upload", "data-upload-accept": ".csv"
+        }),
+        dcc.Store(id="upload"),
+
+    Files chosen by clicking the element, or dropped onto it, are uploaded to the
+    app's server in chunks, and the store's data is set to a dict with the
+    ``handle``, ``filename`` and ``size`` of the upload (or a list of those if the
+    element has a ``data-upload-multiple`` attribute).
+    Callbacks redeem the handle with ``app.uploads.get(handle)``, which returns an
+    ``UploadedFile`` whose data can be read from ``path`` or memory mapped.
+
+    Anyone who can view the app can upload files, within the limits below.
+
+    :param upload_dir: Directory to write uploads to. If None, a temporary
+        directory is created.
+    :param max_file_bytes: Maximum size of an uploaded file, or None for no limit.
+    :param max_total_bytes: Maximum total size of the uploads held at once,
+        complete or not, or None for no limit. Uploads that would exceed it are
+        rejected until others are discarded.
+    :param partial_timeout: Number of seconds after which an incomplete upload that
+        hasn't received a chunk is removed.
+    """
+    def __init__(
+            self, upload_dir=None, max_file_bytes=1024 ** 3,
+            max_total_bytes=4 * 1024 ** 3, partial_timeout=3600
+    ):
+        # Constructor arguments, forwarded to the server process by
+        # run(isolate=True)
+        self._options = dict(
+            max_file_bytes=max_file_bytes, max_total_bytes=max_total_bytes,
+            partial_timeout=partial_timeout,
+        )
+        if upload_dir is not None:
+            self._options["upload_dir"] = upload_dir
+
+        self._owns_upload_dir = upload_dir is None
+        if upload_dir is None:
+            upload_dir = tempfile.mkdtemp(prefix="jupyter_dash_uploads_")
+        else:
+            os.makedirs(upload_dir, exist_ok=True)
+        self.upload_dir = upload_dir
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.partial_timeout = partial_timeout
+
+        # upload_id -> _PartialUpload for incomplete uploads, which are only bound
+        # to a session once complete, since the concurrent first chunks of several
+        # files may each start a new session. Ids are 128-bit random values.
+        self._partial = {}
+        # (sid, upload_id) -> UploadedFile for complete uploads
+        self._files = {}
+        # Bytes held on disk by all uploads
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, handle):
+        """Return the UploadedFile referenced by handle
+
+        :param handle: The ``handle`` of an upload, as set by the browser
+        :raises KeyError: If the handle is unknown or the upload was discarded
+        """
+        sid, _, upload_id = str(handle).partition("/")
+        # Uploads can only be redeemed by the session that made them, except from
+        # the notebook itself
+        if flask.has_request_context() and sid != _session_id():
+            sid = None
+        with self._lock:
+            uploaded = self._files.get((sid, upload_id))
+        if uploaded is None:
+            raise KeyError(
+                "No upload for handle {handle}".format(handle=repr(handle))
+            )
+        return uploaded
+
+    def discard(self, handle):
+        """Remove the upload referenced by handle from disk, if present"""
+        sid, _, upload_id = str(handle).partition("/")
+        if flask.has_request_context() and sid != _session_id():
+            return
+        with self._lock:
+            uploaded = self._files.pop((sid, upload_id), None)
+            if uploaded is not None:
+                self._total_bytes -= uploaded.size
+        if uploaded is not None:
+            uploaded._remove()
+
+    def clear(self):
+        """Remove all uploads, complete or not, from disk"""
+        with self._lock:
+            uploads = list(self._files.values()) + [
+                partial.uploaded for partial in self._partial.values()
+            ]
+            self._files.clear()
+            self._partial.clear()
+            self._total_bytes = 0
+        for uploaded in uploads:
+            uploaded._remove()
+
+    def _expire_partial(self):
+        """Remove incomplete uploads that haven't received a chunk within
+        partial_timeout seconds"""
+        expired = []
+        deadline = time.monotonic() - self.partial_timeout
+        with self._lock:
+            for upload_id, partial in list(self._partial.items()):
+                # Skip uploads receiving a chunk, rather than waiting for them
+                if partial.updated < deadline and partial.lock.acquire(False):
+                    try:
+                        del self._partial[upload_id]
+                        self._total_bytes -= partial.uploaded.size
+                        expired.append(partial.uploaded)
+                    finally:
+                        partial.lock.release()
+        for uploaded in expired:
+            uploaded._remove()
+
+    def _receive_chunk(self, upload_id):
+        if not _valid_session_id(upload_id):
+            return flask.jsonify(error="Invalid upload id"), 400
+        try:
+            offset = int(flask.request.headers.get("X-Upload-Offset", 0))
+        except ValueError:
+            return flask.jsonify(error="Invalid offset"), 400
+        filename = os.path.basename(
+            unquote(flask.request.headers.get("X-Upload-Filename", ""))
+        )
+
+        self._expire_partial()
+        with self._lock:
+            partial = self._partial.get(upload_id)
+            if partial is None and offset == 0:
+                path = os.path.join(self.upload_dir, upload_id)
+                partial = self._partial[upload_id] = _PartialUpload(
+                    UploadedFile(path, filename, 0)
+                )
+                open(path, "wb").close()
+        if partial is None:
+            return flask.jsonify(error="Unexpected offset", size=0), 409
+
+        with partial.lock:
+            uploaded = partial.uploaded
+            with self._lock:
+                current = self._partial.get(upload_id) is partial
+            # Chunks must be sent in order, a client can resume from the returned
+            # size
+            if not current or offset != uploaded.size:
+                size = uploaded.size if current else 0
+                return flask.jsonify(error="Unexpected offset", size=size), 409
+
+            error = None
+            stream = flask.request.stream
+            with open(uploaded.path, "ab") as f:
+                while True:
+                    data = stream.read(_READ_SIZE)
+                    if not data:
+                        break
+                    if self.max_file_bytes is not None and \
+                            uploaded.size + len(data) > self.max_file_bytes:
+                        error = flask.jsonify(error="File too large"), 413
+                        break
+                    with self._lock:
+                        if self.max_total_bytes is not None and \
+                                self._total_bytes + len(data) > self.max_total_bytes:
+                            error = flask.jsonify(error="Upload storage full"), 507
+                            break
+                        self._total_bytes += len(data)
+                    f.write(data)
+                    uploaded.size += len(data)
+            partial.updated = time.monotonic()
+
+            if error is not None:
+                with self._lock:
+                    del self._partial[upload_id]
+                    self._total_bytes -= uploaded.size
+                uploaded._remove()
+                return error
+
+        return flask.jsonify(size=uploaded.size)
+
+    def _complete(self, upload_id):
+        sid = _session_id()
+        with self._lock:
+            partial = self._partial.get(upload_id)
+        if partial is None:
+            return flask.jsonify(error="Unknown upload"), 404
+        # Wait for a chunk that is still being written
+        with partial.lock, self._lock:
+            if self._partial.get(upload_id) is not partial:
+                return flask.jsonify(error="Unknown upload"), 404
+            del self._partial[upload_id]
+            uploaded = partial.uploaded
+            self._files[(sid, upload_id)] = uploaded
+        return flask.jsonify(
+            handle="{sid}/{upload_id}".format(sid=sid, upload_id=upload_id),
+            filename=uploaded.filename,
+            size=uploaded.size,
+        )
+
+    def _install(self, server, routes_pathname_prefix):
+        """Register the upload routes on server"""
+        route = routes_pathname_prefix + _UPLOAD_ROUTE + "<upload_id>"
+        server.add_url_rule(
+            route, "_jupyter_dash_upload", self._receive_chunk, methods=["POST"]
+        )
+        server.add_url_rule(
+            route + "/complete", "_jupyter_dash_upload_complete", self._complete,
+            methods=["POST"]
+        )
+
+    def __del__(self):
+        if self._owns_upload_dir and self.upload_dir:
+            shutil.rmtree(self.upload_dir, ignore_errors=True)
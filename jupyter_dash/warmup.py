@@ -0,0 +1,162 @@
+import collections
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .introspection import (
+    _callback_specs, _dep_key, _initial_values, _input_domains
+)
+from .testing import CallbackTestClient
+
+# WSGI environ key marking requests whose responses should seed the cache
+_WARMUP = "jupyter_dash.warmup"
+
+
+def _cache_key(body):
+    """Key identifying a ``_dash-update-component`` request body. Missing values
+    are treated as None, as the browser omits the value of undefined props."""
+    def values(deps):
+        return [[d.get("id"), d.get("property"), d.get("value")] for d in deps or []]
+
+    return json.dumps(
+        [
+            body.get("output"),
+            values(body.get("inputs")),
+            values(body.get("state")),
+            sorted(body.get("changedPropIds") or []),
+        ],
+        sort_keys=True, separators=(",", ":"),
+    )
+
+
+class ResponseCache(object):
+    """Callback responses computed ahead of time by the warm-up phase of
+    ``JupyterDash.run``"""
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._responses = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, body):
+        key = _cache_key(body)
+        with self._lock:
+            data = self._responses.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+
+    def put(self, body, data):
+        key = _cache_key(body)
+        with self._lock:
+            self._responses[key] = data
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+
+    def __len__(self):
+        return len(self._responses)
+
+
+def _variations(initial, domains):
+    """Yield dicts of input values, starting with the initial values, followed by
+    those differing from them in one input, then two inputs, etc."""
+    keys = list(domains)
+    yield {}
+    for n in range(1, len(keys) + 1):
+        for changed in itertools.combinations(keys, n):
+            alternatives = [
+                [v for v in domains[k] if v != initial.get(k)] for k in changed
+            ]
+            for values in itertools.product(*alternatives):
+                yield dict(zip(changed, values))
+
+
+def _warmup_tasks(app, budget, domains=None):
+    """Return up to budget (output, inputs, triggered) tuples, spread across
+    the callbacks with enumerable inputs
+
+    :param domains: dict from "id.prop" strings to lists of values, overriding or
+        adding to the enumerable domains of inputs found in the layout
+    """
+    specs = _callback_specs(app)
+    initial = _initial_values(app, specs)
+    all_domains = _input_domains(app, specs)
+    for key, values in (domains or {}).items():
+        all_domains[key] = list(values)
+
+    generators = []
+    for spec in specs:
+        spec_domains = {
+            _dep_key(dep): all_domains[_dep_key(dep)]
+            for dep in spec["inputs"] if _dep_key(dep) in all_domains
+        }
+        if not spec_domains:
+            continue
+
+        def tasks(spec=spec, spec_domains=spec_domains):
+            for variation in _variations(initial, spec_domains):
+                if not variation:
+                    # Initial call made when the page loads
+                    yield spec["output"], {}, []
+                    continue
+                # The last input to change is the one that triggers the callback
+                for trigger in variation:
+                    yield spec["output"], variation, [trigger]
+        generators.append(tasks())
+
+    # Round-robin across callbacks so that a single callback with many
+    # combinations doesn't use up the whole budget
+    result = []
+    while generators and len(result) < budget:
+        for gen in list(generators):
+            try:
+                result.append(next(gen))
+            except StopIteration:
+                generators.remove(gen)
+            if len(result) >= budget:
+                break
+    return result
+
+
+def _run_warmup(app, budget, max_workers=4, progress=None):
+    """Execute the callbacks of app over their enumerable inputs, seeding
+    app._response_cache with the responses.
+
+    :param progress: Function called with (completed, total, errors, elapsed) after
+        each callback, and when the warm-up finishes
+    """
+    tasks = _warmup_tasks(app, budget)
+    client = CallbackTestClient(app)
+    client._client.environ_base[_WARMUP] = True
+
+    lock = threading.Lock()
+    counts = {"completed": 0, "errors": 0}
+    t0 = time.time()
+
+    def execute(task):
+        output, inputs, triggered = task
+        try:
+            client.call(output, inputs=inputs, triggered=triggered)
+        except Exception as e:
+            from dash.exceptions import PreventUpdate
+            error = not isinstance(e, PreventUpdate)
+        else:
+            error = False
+        with lock:
+            counts["completed"] += 1
+            counts["errors"] += int(error)
+            if progress is not None:
+                progress(
+                    counts["completed"], len(tasks), counts["errors"],
+                    time.time() - t0
+                )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(execute, tasks))
+
+    return counts["completed"], counts["errors"]